@@ -0,0 +1,38 @@
+"""Widen trades.outcome/side and add trades.market_slug
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+
+Fresh databases get the current schema from create_all() on startup, so
+every migration is a no-op when the table does not exist yet.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("trades"):
+        return
+
+    # Outcomes can be team names like "Diamondbacks"; side includes "redeem"
+    op.alter_column("trades", "outcome", type_=sa.String(255))
+    op.alter_column("trades", "side", type_=sa.String(10))
+
+    columns = {c["name"] for c in inspector.get_columns("trades")}
+    if "market_slug" not in columns:
+        op.add_column("trades", sa.Column("market_slug", sa.String(500)))
+
+
+def downgrade() -> None:
+    # Column widening is not reversed: narrowing could truncate existing data.
+    # market_slug is kept too: the model defines it, so databases created by create_all()
+    # already had it before this revision, and dropping it would lose their slugs.
+    pass
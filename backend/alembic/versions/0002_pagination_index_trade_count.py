@@ -0,0 +1,34 @@
+"""Add keyset pagination index and cache_metadata.trade_count
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table("trades"):
+        op.execute("CREATE INDEX IF NOT EXISTS ix_trades_wallet_ts_id ON trades (wallet_address, timestamp DESC, id DESC)")
+        op.execute("DROP INDEX IF EXISTS ix_trades_wallet_address")
+        op.execute("DROP INDEX IF EXISTS ix_trades_wallet_ts")
+
+    if inspector.has_table("cache_metadata"):
+        columns = {c["name"] for c in inspector.get_columns("cache_metadata")}
+        if "trade_count" not in columns:
+            op.add_column("cache_metadata", sa.Column("trade_count", sa.Integer()))
+
+
+def downgrade() -> None:
+    op.drop_column("cache_metadata", "trade_count")
+    op.create_index("ix_trades_wallet_address", "trades", ["wallet_address"])
+    op.drop_index("ix_trades_wallet_ts_id", table_name="trades")
@@ -0,0 +1,42 @@
+"""Add trade_tags and backfill it from trades.tags
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # Fresh databases get the table from create_all at startup
+    if not inspector.has_table("trades") or inspector.has_table("trade_tags"):
+        return
+
+    op.create_table(
+        "trade_tags",
+        sa.Column("trade_tx_hash", sa.String(66), primary_key=True),
+        sa.Column("tag", sa.String(255), primary_key=True),
+    )
+    op.create_index("ix_trade_tags_tag", "trade_tags", ["tag"])
+
+    op.execute("""
+        INSERT INTO trade_tags (trade_tx_hash, tag)
+        SELECT DISTINCT trades.tx_hash, btrim(tag)
+        FROM trades, unnest(string_to_array(trades.tags, ',')) AS tag
+        WHERE btrim(tag) <> ''
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trade_tags_tag", table_name="trade_tags")
+    op.drop_table("trade_tags")
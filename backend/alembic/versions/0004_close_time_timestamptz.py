@@ -0,0 +1,33 @@
+"""Store trades.close_time as timestamptz
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("trades"):
+        return
+
+    columns = {c["name"]: c["type"] for c in inspector.get_columns("trades")}
+    if isinstance(columns.get("close_time"), sa.String):
+        # Existing values are Gamma closedTime strings such as "2020-11-02 16:31:01+00"
+        op.execute("""
+            ALTER TABLE trades
+            ALTER COLUMN close_time TYPE TIMESTAMP WITH TIME ZONE
+            USING NULLIF(close_time, '')::timestamptz
+        """)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE trades ALTER COLUMN close_time TYPE VARCHAR USING close_time::text")
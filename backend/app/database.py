@@ -1,10 +1,34 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(settings.database_url, echo=False)
+# Upper bound on waiting for table locks during startup DDL and migrations
+DDL_LOCK_TIMEOUT = "2s"
+
+connect_args = {}
+if settings.database_url.startswith("postgresql+asyncpg://"):
+    connect_args["server_settings"] = {
+        # Hour-of-day analytics are bucketed in SQL, so sessions must run in UTC
+        "timezone": "UTC",
+        # Keep idle pooled connections alive through proxies that drop quiet sockets
+        "tcp_keepalives_idle": "30",
+        "tcp_keepalives_interval": "10",
+        "tcp_keepalives_count": "5",
+    }
+
+engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.pool_size,
+    max_overflow=settings.max_overflow,
+    pool_recycle=settings.pool_recycle,
+    pool_pre_ping=True,
+    connect_args=connect_args,
+)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -21,6 +45,7 @@ async def get_db():
 
 
 async def init_db():
+    """Create missing tables. Schema changes to existing tables live in Alembic migrations."""
     import logging
     from sqlalchemy import text
     # Import models so they register with Base.metadata
@@ -29,29 +54,12 @@ async def init_db():
     logger = logging.getLogger(__name__)
     logger.info("Initializing database...")
 
+    # All DDL runs in one transaction; fail fast instead of queueing behind locks held by live traffic
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
         logger.info("Creating tables...")
         await conn.run_sync(Base.metadata.create_all)
         logger.info("Tables created successfully")
 
-        # Migrate column sizes if needed (safe to run multiple times)
-        try:
-            await conn.execute(text("ALTER TABLE trades ALTER COLUMN outcome TYPE VARCHAR(255)"))
-            logger.info("Migrated outcome column")
-        except Exception as e:
-            logger.info(f"Outcome column migration skipped: {e}")
-
-        try:
-            await conn.execute(text("ALTER TABLE trades ALTER COLUMN side TYPE VARCHAR(10)"))
-            logger.info("Migrated side column")
-        except Exception as e:
-            logger.info(f"Side column migration skipped: {e}")
-
-        # Add market_slug column if it doesn't exist
-        try:
-            await conn.execute(text("ALTER TABLE trades ADD COLUMN market_slug VARCHAR(500)"))
-            logger.info("Added market_slug column")
-        except Exception as e:
-            logger.info(f"market_slug column migration skipped: {e}")
-
     logger.info("Database initialization complete")
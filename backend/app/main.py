@@ -1,21 +1,27 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from app.database import init_db
 from app.routers import trades
+from app.services.http import close_client
+from app.services.cache import close_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
     yield
+    await close_client()
+    await close_cache()
 
 
 app = FastAPI(
     title="Harpoon API",
     description="Polymarket trade viewer API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
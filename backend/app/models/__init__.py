@@ -1 +1 @@
-from app.models.trade import Trade, CacheMetadata, TradeResponse, TradesListResponse, ProfileInfo
+from app.models.trade import Trade, TradeTag, CacheMetadata, WalletAnalytics, TradeResponse, TradesListResponse, ProfileInfo, PageCursor
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, BigInteger, DECIMAL, DateTime, Index, Boolean
+from sqlalchemy import Column, String, Integer, BigInteger, Numeric, DateTime, Index, Boolean, JSON
 from sqlalchemy.sql import func
 from pydantic import BaseModel
 from datetime import datetime
@@ -11,23 +11,36 @@ class Trade(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     tx_hash = Column(String(66), unique=True, nullable=False)
-    wallet_address = Column(String(42), nullable=False, index=True)
+    wallet_address = Column(String(42), nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
     market_id = Column(String(255))
     market_title = Column(String)
     market_slug = Column(String(500))  # Polymarket URL slug
     outcome = Column(String(255))  # Can be team names like "Diamondbacks"
     side = Column(String(10))  # buy, sell, redeem
-    amount = Column(DECIMAL(20, 8))
-    price = Column(DECIMAL(10, 8))
+    amount = Column(Numeric(20, 8, asdecimal=False))  # Returned as float; no Decimal per row
+    price = Column(Numeric(10, 8, asdecimal=False))
     token_id = Column(String(255))
     block_number = Column(BigInteger)
     tags = Column(String)  # Comma-separated tags
     closed = Column(Boolean, default=False)  # Whether market is resolved
-    close_time = Column(String)  # When market closed (ISO format string)
+    close_time = Column(DateTime(timezone=True))  # When market closed
     outcome_won = Column(Boolean)  # Whether this outcome won
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Serves the per-wallet "newest first" keyset pagination as a pure index range scan
+        Index("ix_trades_wallet_ts_id", wallet_address, timestamp.desc(), id.desc()),
+    )
+
+
+class TradeTag(Base):
+    __tablename__ = "trade_tags"
+
+    # One row per (trade, tag), split from Trade.tags once at ingest
+    trade_tx_hash = Column(String(66), primary_key=True)
+    tag = Column(String(255), primary_key=True, index=True)
+
 
 class CacheMetadata(Base):
     __tablename__ = "cache_metadata"
@@ -35,6 +48,18 @@ class CacheMetadata(Base):
     wallet_address = Column(String(42), primary_key=True)
     last_fetched = Column(DateTime(timezone=True), nullable=False)
     last_block_number = Column(BigInteger)
+    trade_count = Column(Integer)  # Trades stored for this wallet as of last_fetched
+
+
+class WalletAnalytics(Base):
+    __tablename__ = "wallet_analytics"
+
+    # Denormalized analytics, recomputed in the background after each refresh
+    wallet_address = Column(String(42), primary_key=True)
+    timezone_analysis = Column(JSON, nullable=False)
+    insider_metrics = Column(JSON)
+    top_categories = Column(JSON, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
 
 
 class TradeResponse(BaseModel):
@@ -98,6 +123,12 @@ class InsiderMetrics(BaseModel):
     total_trades: int  # Total trades analyzed
 
 
+class PageCursor(BaseModel):
+    """Keyset position of the last trade on a page; pass back to fetch the next one."""
+    after_ts: datetime
+    after_id: int
+
+
 class TradesListResponse(BaseModel):
     address: str
     profile: ProfileInfo | None
@@ -109,3 +140,4 @@ class TradesListResponse(BaseModel):
     timezone_analysis: TimezoneAnalysis | None
     top_categories: list[CategoryStat]
     insider_metrics: InsiderMetrics | None
+    next_cursor: PageCursor | None = None
@@ -1,15 +1,21 @@
+import asyncio
 import logging
+import math
 import traceback
-from fastapi import APIRouter, Depends, HTTPException, Query
+import numpy as np
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, extract, tuple_, and_, cast, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime, timedelta, timezone
-from app.database import get_db
-from app.models.trade import Trade, CacheMetadata, TradeResponse, TradesListResponse, ProfileInfo, TimezoneAnalysis, CategoryStat, InsiderMetrics
-from collections import Counter
-from app.services.subgraph import fetch_trades_from_subgraph, fetch_profit_from_positions
+from app.database import get_db, async_session
+from app.models.trade import Trade, TradeTag, CacheMetadata, WalletAnalytics, TradeResponse, TradesListResponse, ProfileInfo, TimezoneAnalysis, CategoryStat, InsiderMetrics, PageCursor
+from app.services.subgraph import fetch_trades_from_subgraph, fetch_profit_from_positions, evict_trades_cache
 from app.services.profile import resolve_profile_to_address, fetch_public_profile
+from app.services.cache import trades_response_key, get_cached_response, set_cached_response, invalidate_trades_responses
 from app.utils.address import is_valid_address
+from app.utils.batching import chunked
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +24,14 @@ router = APIRouter()
 
 CACHE_TTL_MINUTES = 5
 
+POLYGONSCAN_TX_PREFIX = "https://polygonscan.com/tx/"
+
+# Rows per bulk INSERT: ~16 columns * 1000 rows stays well under asyncpg's 32767 bind parameter limit
+INSERT_BATCH_SIZE = 1000
+
+# Wallets with fewer trades than this are counted live; the count is cheap and always exact
+TRADE_COUNT_CACHE_THRESHOLD = 1000
+
 # Common timezones with their UTC offsets and typical names
 TIMEZONE_MAP = [
     (-12, "Baker Island"),
@@ -48,26 +62,39 @@ TIMEZONE_MAP = [
     (12, "New Zealand"),
 ]
 
+# Unit-circle coordinates of each UTC hour, for the circular mean of activity
+_HOUR_ANGLES = np.arange(24) * (2 * np.pi / 24)
+_HOUR_SIN = np.sin(_HOUR_ANGLES)
+_HOUR_COS = np.cos(_HOUR_ANGLES)
+
+_TZ_OFFSETS = np.array([tz[0] for tz in TIMEZONE_MAP])
 
-def calculate_timezone_analysis(timestamps: list[datetime]) -> TimezoneAnalysis:
-    """Calculate hourly distribution and infer timezone from trade timestamps."""
-    if not timestamps:
-        return TimezoneAnalysis(
-            hourly_distribution=[0] * 24,
-            inferred_timezone=None,
-            inferred_utc_offset=None,
-            activity_center_utc=None
-        )
 
-    # Calculate hourly distribution (UTC)
-    hourly_counts = [0] * 24
-    for ts in timestamps:
-        hour = ts.hour
-        hourly_counts[hour] += 1
+def insert_ignoring_conflicts(db: AsyncSession, model, rows: list[dict], index_elements: list[str]):
+    """Build a dialect-specific bulk INSERT that ignores unique conflicts."""
+    if db.bind.dialect.name == "sqlite":
+        stmt = sqlite_insert(model).values(rows)
+    else:
+        stmt = pg_insert(model).values(rows)
+    return stmt.on_conflict_do_nothing(index_elements=index_elements)
 
+
+def insert_or_update(db: AsyncSession, model, row: dict, index_elements: list[str]):
+    """Build a dialect-specific INSERT that overwrites the existing row on a unique conflict."""
+    if db.bind.dialect.name == "sqlite":
+        stmt = sqlite_insert(model).values(row)
+    else:
+        stmt = pg_insert(model).values(row)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in row if column not in index_elements},
+    )
+
+
+def calculate_timezone_analysis(hourly_counts: list[int]) -> TimezoneAnalysis:
+    """Infer timezone from a 24-bucket UTC hourly trade distribution."""
     # Calculate activity center (weighted circular mean for hours)
     # Using circular statistics to handle the 23->0 wrap-around
-    import math
     total_weight = sum(hourly_counts)
     if total_weight == 0:
         return TimezoneAnalysis(
@@ -77,12 +104,9 @@ def calculate_timezone_analysis(timestamps: list[datetime]) -> TimezoneAnalysis:
             activity_center_utc=None
         )
 
-    sin_sum = 0
-    cos_sum = 0
-    for hour, count in enumerate(hourly_counts):
-        angle = 2 * math.pi * hour / 24
-        sin_sum += count * math.sin(angle)
-        cos_sum += count * math.cos(angle)
+    counts = np.asarray(hourly_counts, dtype=np.float64)
+    sin_sum = float(counts @ _HOUR_SIN)
+    cos_sum = float(counts @ _HOUR_COS)
 
     avg_angle = math.atan2(sin_sum, cos_sum)
     if avg_angle < 0:
@@ -104,7 +128,7 @@ def calculate_timezone_analysis(timestamps: list[datetime]) -> TimezoneAnalysis:
     utc_offset_rounded = round(utc_offset * 2) / 2
 
     # Find closest timezone
-    closest_tz = min(TIMEZONE_MAP, key=lambda tz: abs(tz[0] - utc_offset_rounded))
+    closest_tz = TIMEZONE_MAP[int(np.argmin(np.abs(_TZ_OFFSETS - utc_offset_rounded)))]
 
     return TimezoneAnalysis(
         hourly_distribution=hourly_counts,
@@ -114,11 +138,206 @@ def calculate_timezone_analysis(timestamps: list[datetime]) -> TimezoneAnalysis:
     )
 
 
+async def count_trades(address: str) -> int:
+    """Exact number of stored trades for a wallet."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(func.count()).select_from(Trade).where(Trade.wallet_address == address)
+        )
+        return result.scalar()
+
+
+async def fetch_trade_page(
+    address: str,
+    page: int,
+    limit: int,
+    after_ts: datetime | None,
+    after_id: int | None,
+) -> list:
+    """Fetch one page of a wallet's trades, newest first."""
+    # Plain column tuples: the response needs no ORM identity map or attribute instrumentation
+    trades_stmt = select(
+        Trade.id, Trade.tx_hash, Trade.timestamp, Trade.market_id, Trade.market_title,
+        Trade.market_slug, Trade.outcome, Trade.side, Trade.amount, Trade.price, Trade.token_id
+    ).where(Trade.wallet_address == address)
+    if after_ts is not None and after_id is not None:
+        # Seek past the cursor instead of scanning and discarding OFFSET rows; the row-value
+        # comparison walks ix_trades_wallet_ts_id in order
+        trades_stmt = trades_stmt.where(tuple_(Trade.timestamp, Trade.id) < (after_ts, after_id))
+    else:
+        trades_stmt = trades_stmt.offset((page - 1) * limit)
+
+    async with async_session() as session:
+        trades_result = await session.execute(
+            trades_stmt
+            .order_by(Trade.timestamp.desc(), Trade.id.desc())
+            .limit(limit)
+        )
+        return trades_result.all()
+
+
+async def fetch_hourly_counts(address: str) -> list[int]:
+    """24-bucket UTC hour-of-day histogram of a wallet's trades, built in SQL."""
+    hour_col = extract("hour", Trade.timestamp)
+    async with async_session() as session:
+        hourly_result = await session.execute(
+            select(hour_col, func.count())
+            .where(Trade.wallet_address == address)
+            .group_by(hour_col)
+        )
+        hourly_counts = [0] * 24
+        for hour, count in hourly_result:
+            hourly_counts[int(hour)] = count
+        return hourly_counts
+
+
+async def compute_insider_metrics(address: str) -> InsiderMetrics | None:
+    """Insider metrics over a wallet's resolved buys, aggregated in a single SQL pass."""
+    resolved = and_(
+        Trade.side == "buy",
+        Trade.closed.is_(True),
+        Trade.outcome_won.is_not(None),
+        Trade.price != 0,
+    )
+    won = Trade.outcome_won.is_(True)
+    contrarian = Trade.price < 0.5
+    # Aggregate in double precision: numeric AVG is slower and comes back as Decimal
+    hours_before = cast(extract("epoch", Trade.close_time - Trade.timestamp), Float) / 3600
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(
+                func.count(),
+                func.count().filter(resolved),
+                func.count().filter(and_(resolved, won)),
+                func.avg(cast(Trade.price, Float)).filter(resolved),
+                func.count().filter(and_(resolved, contrarian)),
+                func.count().filter(and_(resolved, contrarian, won)),
+                func.avg(hours_before).filter(and_(resolved, hours_before >= 0)),
+                func.count().filter(and_(resolved, hours_before.between(0, 24))),
+                func.count().filter(and_(resolved, hours_before.between(0, 1))),
+            ).where(Trade.wallet_address == address)
+        )
+        (
+            total_trades, total_resolved, wins, avg_price, contrarian_count,
+            contrarian_wins, avg_hours, trades_within_24h, trades_within_1h
+        ) = result.one()
+
+    if not total_resolved:
+        return None
+
+    win_rate = (wins / total_resolved) * 100
+
+    # Expected win rate = average entry price (buy at 0.3 means 30% expected)
+    expected_win_rate = avg_price * 100
+
+    # Win rate edge
+    win_rate_edge = win_rate - expected_win_rate
+
+    # Contrarian trades: betting on unlikely outcome (price < 0.5)
+    contrarian_win_rate = (contrarian_wins / contrarian_count * 100) if contrarian_count > 0 else None
+
+    return InsiderMetrics(
+        win_rate=round(win_rate, 1),
+        expected_win_rate=round(expected_win_rate, 1),
+        win_rate_edge=round(win_rate_edge, 1),
+        contrarian_trades=contrarian_count,
+        contrarian_wins=contrarian_wins,
+        contrarian_win_rate=round(contrarian_win_rate, 1) if contrarian_win_rate is not None else None,
+        avg_hours_before_close=round(avg_hours, 1) if avg_hours is not None else None,
+        trades_within_24h=trades_within_24h,
+        trades_within_1h=trades_within_1h,
+        resolved_trades=total_resolved,
+        total_trades=total_trades
+    )
+
+
+async def compute_top_categories(address: str) -> list[CategoryStat]:
+    """Most frequent market tags over a wallet's full trade history."""
+    tag_count = func.count()
+    async with async_session() as session:
+        result = await session.execute(
+            select(TradeTag.tag, tag_count, func.sum(tag_count).over())
+            .join(Trade, Trade.tx_hash == TradeTag.trade_tx_hash)
+            .where(Trade.wallet_address == address)
+            .group_by(TradeTag.tag)
+            .order_by(tag_count.desc(), TradeTag.tag)
+            .limit(10)
+        )
+        rows = result.all()
+
+    # Calculate top categories (without P/L since we can't accurately track it)
+    return [
+        CategoryStat(
+            name=tag,
+            count=count,
+            percentage=round((count / float(total_tag_count)) * 100, 1) if total_tag_count else 0,
+            pnl=None  # Can't accurately calculate without redemption tracking per category
+        )
+        for tag, count, total_tag_count in rows
+    ]
+
+
+async def compute_wallet_analytics(address: str) -> tuple[TimezoneAnalysis, InsiderMetrics | None, list[CategoryStat]]:
+    """Run every full-history analytics query for a wallet."""
+    hourly_counts, insider_metrics, top_categories = await asyncio.gather(
+        fetch_hourly_counts(address),
+        compute_insider_metrics(address),
+        compute_top_categories(address),
+    )
+    return calculate_timezone_analysis(hourly_counts), insider_metrics, top_categories
+
+
+async def load_wallet_analytics(address: str) -> tuple[TimezoneAnalysis, InsiderMetrics | None, list[CategoryStat]] | None:
+    """Precomputed analytics for a wallet, or None if they were never stored."""
+    async with async_session() as session:
+        row = await session.get(WalletAnalytics, address)
+    if row is None:
+        return None
+    return (
+        TimezoneAnalysis.model_validate(row.timezone_analysis),
+        InsiderMetrics.model_validate(row.insider_metrics) if row.insider_metrics else None,
+        [CategoryStat.model_validate(c) for c in row.top_categories],
+    )
+
+
+async def store_wallet_analytics(
+    address: str,
+    analytics: tuple[TimezoneAnalysis, InsiderMetrics | None, list[CategoryStat]],
+) -> None:
+    """Upsert a wallet's precomputed analytics."""
+    tz_analysis, insider_metrics, top_categories = analytics
+    # An upsert rather than merge(): concurrent first views of a wallet would both INSERT
+    async with async_session() as session:
+        await session.execute(insert_or_update(session, WalletAnalytics, {
+            "wallet_address": address,
+            "timezone_analysis": tz_analysis.model_dump(mode="json"),
+            "insider_metrics": insider_metrics.model_dump(mode="json") if insider_metrics else None,
+            "top_categories": [c.model_dump(mode="json") for c in top_categories],
+            "computed_at": datetime.now(timezone.utc),
+        }, ["wallet_address"]))
+        await session.commit()
+
+
+async def recompute_wallet_analytics(address: str) -> None:
+    """Background task: refresh a wallet's stored analytics after new trades landed."""
+    try:
+        await store_wallet_analytics(address, await compute_wallet_analytics(address))
+        # Pages cached while the recompute ran still carry the previous analytics
+        await invalidate_trades_responses(address)
+    except Exception as e:
+        logger.error(f"Analytics recompute error for {address}: {str(e)}")
+        logger.error(traceback.format_exc())
+
+
 @router.get("/trades/{address_or_url:path}", response_model=TradesListResponse)
 async def get_trades(
     address_or_url: str,
-    page: int = Query(1, ge=1),
+    background_tasks: BackgroundTasks,
+    page: int = Query(1, ge=1, deprecated=True, description="Offset pagination; ignored when a cursor is given"),
     limit: int = Query(50, ge=1, le=100),
+    after_ts: datetime | None = Query(None, description="Keyset cursor: timestamp of the last trade already seen"),
+    after_id: int | None = Query(None, description="Keyset cursor: id of the last trade already seen"),
     db: AsyncSession = Depends(get_db)
 ):
     logger.info(f"Processing request for: {address_or_url}")
@@ -142,11 +361,22 @@ async def get_trades(
 
     address = address.lower()
 
+    # A rendered page is valid for as long as the trades behind it
+    response_key = await trades_response_key(address, page, limit, after_ts, after_id)
+    cached_body = await get_cached_response(response_key)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
+
     cache_result = await db.execute(
         select(CacheMetadata).where(CacheMetadata.wallet_address == address)
     )
     cache_meta = cache_result.scalar_one_or_none()
 
+    # Profile and P/L lookups are independent external I/O; overlap them with the DB work below.
+    # Every error path from here until they are awaited cancels them.
+    profile_task = asyncio.create_task(fetch_public_profile(address))
+    profit_task = asyncio.create_task(fetch_profit_from_positions(address))
+
     now = datetime.now(timezone.utc)
     should_refresh = cache_meta is None
     if cache_meta is not None:
@@ -158,80 +388,120 @@ async def get_trades(
 
     if should_refresh:
         try:
-            new_trades = await fetch_trades_from_subgraph(address)
-
-            # Get all existing tx_hashes for this wallet to avoid duplicates
-            existing_hashes_result = await db.execute(
-                select(Trade.tx_hash).where(Trade.wallet_address == address)
+            # Only fetch trades from the newest one we already have onwards
+            since = None
+            if cache_meta is not None:
+                since_result = await db.execute(
+                    select(func.max(Trade.timestamp)).where(Trade.wallet_address == address)
+                )
+                since = since_result.scalar()
+                if since is not None and since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+
+            new_trades = await fetch_trades_from_subgraph(address, since=since)
+
+            rows = [
+                {
+                    "tx_hash": trade_data.tx_hash,
+                    "wallet_address": address,
+                    "timestamp": trade_data.timestamp,
+                    "market_id": trade_data.market_id,
+                    "market_title": trade_data.market_title,
+                    "market_slug": trade_data.market_slug,
+                    "outcome": trade_data.outcome,
+                    "side": trade_data.side,
+                    "amount": trade_data.amount,
+                    "price": trade_data.price,
+                    "token_id": trade_data.token_id,
+                    "block_number": trade_data.block_number,
+                    "tags": trade_data.tags,
+                    "closed": trade_data.closed,
+                    "close_time": trade_data.close_time,
+                    "outcome_won": trade_data.outcome_won,
+                }
+                for trade_data in new_trades
+            ]
+
+            # Bulk INSERTs that skip tx_hashes we already have (including duplicates within the batch)
+            for batch in chunked(rows, INSERT_BATCH_SIZE):
+                await db.execute(insert_ignoring_conflicts(db, Trade, batch, ["tx_hash"]))
+
+            # Split tags once here so category stats are a plain GROUP BY on reads
+            tag_rows = [
+                {"trade_tx_hash": row["tx_hash"], "tag": tag}
+                for row in rows if row["tags"]
+                for tag in {t.strip() for t in row["tags"].split(",")} if tag
+            ]
+            for batch in chunked(tag_rows, INSERT_BATCH_SIZE):
+                await db.execute(insert_ignoring_conflicts(db, TradeTag, batch, ["trade_tx_hash", "tag"]))
+
+            # Count once per refresh; reads reuse it until the next refresh for large wallets
+            count_result = await db.execute(
+                select(func.count()).select_from(Trade).where(Trade.wallet_address == address)
             )
-            existing_hashes = set(row[0] for row in existing_hashes_result.fetchall())
-
-            for trade_data in new_trades:
-                if trade_data["tx_hash"] not in existing_hashes:
-                    trade = Trade(
-                        tx_hash=trade_data["tx_hash"],
-                        wallet_address=address,
-                        timestamp=trade_data["timestamp"],
-                        market_id=trade_data.get("market_id"),
-                        market_title=trade_data.get("market_title"),
-                        market_slug=trade_data.get("market_slug"),
-                        outcome=trade_data.get("outcome"),
-                        side=trade_data.get("side"),
-                        amount=trade_data.get("amount"),
-                        price=trade_data.get("price"),
-                        token_id=trade_data.get("token_id"),
-                        block_number=trade_data.get("block_number"),
-                        tags=trade_data.get("tags"),
-                        closed=trade_data.get("closed", False),
-                        close_time=trade_data.get("close_time"),
-                        outcome_won=trade_data.get("outcome_won"),
-                    )
-                    db.add(trade)
-                    existing_hashes.add(trade_data["tx_hash"])  # Prevent duplicates within batch
+            trade_count = count_result.scalar()
+            if trade_count < TRADE_COUNT_CACHE_THRESHOLD:
+                trade_count = None
 
             if cache_meta:
                 cache_meta.last_fetched = now
+                cache_meta.trade_count = trade_count
             else:
                 cache_meta = CacheMetadata(
                     wallet_address=address,
-                    last_fetched=now
+                    last_fetched=now,
+                    trade_count=trade_count
                 )
                 db.add(cache_meta)
 
             await db.commit()
+            await invalidate_trades_responses(address)
         except Exception as e:
             logger.error(f"SUBGRAPH_ERROR for {address}: {str(e)}")
             logger.error(traceback.format_exc())
+            profile_task.cancel()
+            profit_task.cancel()
             raise HTTPException(status_code=500, detail={
                 "code": "SUBGRAPH_ERROR",
                 "message": f"Failed to fetch trades: {str(e)}"
             })
 
+    # Independent reads run concurrently, each on its own pooled connection
     try:
-        count_result = await db.execute(
-            select(func.count()).select_from(Trade).where(Trade.wallet_address == address)
-        )
-        total_count = count_result.scalar()
-
-        offset = (page - 1) * limit
-        trades_result = await db.execute(
-            select(Trade)
-            .where(Trade.wallet_address == address)
-            .order_by(Trade.timestamp.desc())
-            .offset(offset)
-            .limit(limit)
-        )
-        trades = trades_result.scalars().all()
+        reads = [
+            fetch_trade_page(address, page, limit, after_ts, after_id),
+            load_wallet_analytics(address),
+        ]
+        if cache_meta.trade_count is None:
+            reads.append(count_trades(address))
+        trades, analytics, *count = await asyncio.gather(*reads)
+        total_count = count[0] if count else cache_meta.trade_count
+
+        if analytics is None:
+            # First view of this wallet: compute inline and persist after responding
+            analytics = await compute_wallet_analytics(address)
+            background_tasks.add_task(store_wallet_analytics, address, analytics)
+        elif should_refresh:
+            # Serve the previous analytics now; new trades are folded in after responding
+            background_tasks.add_task(recompute_wallet_analytics, address)
+        tz_analysis, insider_metrics, top_categories = analytics
     except Exception as e:
         logger.error(f"Database query error for {address}: {str(e)}")
         logger.error(traceback.format_exc())
+        profile_task.cancel()
+        profit_task.cancel()
         raise HTTPException(status_code=500, detail={
             "code": "DATABASE_ERROR",
             "message": f"Failed to query trades: {str(e)}"
         })
 
+    next_cursor = None
+    if len(trades) == limit:
+        next_cursor = PageCursor(after_ts=trades[-1].timestamp, after_id=trades[-1].id)
+
+    # Rows come straight from typed columns, so skip pydantic re-validation
     trade_responses = [
-        TradeResponse(
+        TradeResponse.model_construct(
             tx_hash=t.tx_hash,
             timestamp=t.timestamp,
             market_id=t.market_id,
@@ -239,16 +509,16 @@ async def get_trades(
             market_slug=t.market_slug,
             outcome=t.outcome,
             side=t.side,
-            amount=str(t.amount) if t.amount else None,
-            price=str(t.price) if t.price else None,
+            amount=f"{t.amount:.8f}" if t.amount else None,
+            price=f"{t.price:.8f}" if t.price else None,
             token_id=t.token_id,
-            polygonscan_url=f"https://polygonscan.com/tx/{t.tx_hash}"
+            polygonscan_url=POLYGONSCAN_TX_PREFIX + t.tx_hash
         )
         for t in trades
     ]
 
     # Fetch profile info
-    profile_data = await fetch_public_profile(address)
+    profile_data = await profile_task
     profile_info = None
     if profile_data:
         profile_info = ProfileInfo(
@@ -260,119 +530,11 @@ async def get_trades(
         )
 
     # Fetch P/L from positions API (most accurate source)
-    profit_data = await fetch_profit_from_positions(address)
+    profit_data = await profit_task
     total_earnings = profit_data["total_pnl"]
 
-    # Get all trades for analytics
-    all_trades_result = await db.execute(
-        select(
-            Trade.side, Trade.amount, Trade.timestamp, Trade.tags,
-            Trade.price, Trade.outcome, Trade.closed, Trade.close_time, Trade.outcome_won
-        ).where(Trade.wallet_address == address)
-    )
-    all_trades_data = all_trades_result.all()
-
-    timestamps = []
-    tag_counter = Counter()
-
-    # Insider metrics tracking
-    resolved_buy_trades = []  # (price, outcome_won, hours_before_close)
-    trades_within_24h = 0
-    trades_within_1h = 0
-
-    for side, amount, timestamp, tags, price, outcome, closed, close_time, outcome_won in all_trades_data:
-        if timestamp:
-            timestamps.append(timestamp)
-
-        # Count tags
-        if tags:
-            for tag in tags.split(","):
-                tag = tag.strip()
-                if tag:
-                    tag_counter[tag] += 1
-
-        # Track resolved buy trades for insider metrics
-        if side == "buy" and closed and outcome_won is not None and price:
-            hours_before = None
-            if close_time and timestamp:
-                try:
-                    from datetime import datetime as dt
-                    # Parse close_time string (format: "2020-11-02 16:31:01+00")
-                    close_dt = dt.fromisoformat(close_time.replace("+00", "+00:00").replace(" ", "T"))
-                    trade_dt = timestamp
-                    if trade_dt.tzinfo is None:
-                        trade_dt = trade_dt.replace(tzinfo=timezone.utc)
-                    hours_before = (close_dt - trade_dt).total_seconds() / 3600
-                    if hours_before >= 0:
-                        if hours_before <= 24:
-                            trades_within_24h += 1
-                        if hours_before <= 1:
-                            trades_within_1h += 1
-                except Exception:
-                    pass
-
-            resolved_buy_trades.append({
-                "price": float(price),
-                "won": outcome_won,
-                "hours_before": hours_before,
-                "outcome": outcome
-            })
-
-    # Calculate insider metrics
-    insider_metrics = None
-    if resolved_buy_trades:
-        total_resolved = len(resolved_buy_trades)
-        wins = sum(1 for t in resolved_buy_trades if t["won"])
-        win_rate = (wins / total_resolved) * 100 if total_resolved > 0 else None
-
-        # Expected win rate = average entry price (buy at 0.3 means 30% expected)
-        avg_price = sum(t["price"] for t in resolved_buy_trades) / total_resolved
-        expected_win_rate = avg_price * 100
-
-        # Win rate edge
-        win_rate_edge = (win_rate - expected_win_rate) if win_rate is not None else None
-
-        # Contrarian trades: betting on unlikely outcome (price < 0.5)
-        contrarian_trades = [t for t in resolved_buy_trades if t["price"] < 0.5]
-        contrarian_count = len(contrarian_trades)
-        contrarian_wins = sum(1 for t in contrarian_trades if t["won"])
-        contrarian_win_rate = (contrarian_wins / contrarian_count * 100) if contrarian_count > 0 else None
-
-        # Average hours before close
-        hours_list = [t["hours_before"] for t in resolved_buy_trades if t["hours_before"] is not None and t["hours_before"] >= 0]
-        avg_hours = sum(hours_list) / len(hours_list) if hours_list else None
-
-        insider_metrics = InsiderMetrics(
-            win_rate=round(win_rate, 1) if win_rate is not None else None,
-            expected_win_rate=round(expected_win_rate, 1),
-            win_rate_edge=round(win_rate_edge, 1) if win_rate_edge is not None else None,
-            contrarian_trades=contrarian_count,
-            contrarian_wins=contrarian_wins,
-            contrarian_win_rate=round(contrarian_win_rate, 1) if contrarian_win_rate is not None else None,
-            avg_hours_before_close=round(avg_hours, 1) if avg_hours is not None else None,
-            trades_within_24h=trades_within_24h,
-            trades_within_1h=trades_within_1h,
-            resolved_trades=total_resolved,
-            total_trades=len(all_trades_data)
-        )
-
-    # Calculate timezone analysis
-    tz_analysis = calculate_timezone_analysis(timestamps)
-
-    # Calculate top categories (without P/L since we can't accurately track it)
-    total_tag_count = sum(tag_counter.values())
-    top_categories = [
-        CategoryStat(
-            name=tag,
-            count=count,
-            percentage=round((count / total_tag_count) * 100, 1) if total_tag_count > 0 else 0,
-            pnl=None  # Can't accurately calculate without redemption tracking per category
-        )
-        for tag, count in tag_counter.most_common(10)
-    ]
-
     try:
-        return TradesListResponse(
+        response = TradesListResponse(
             address=address,
             profile=profile_info,
             trades=trade_responses,
@@ -382,7 +544,8 @@ async def get_trades(
             total_earnings=f"{total_earnings:.2f}",
             timezone_analysis=tz_analysis,
             top_categories=top_categories,
-            insider_metrics=insider_metrics
+            insider_metrics=insider_metrics,
+            next_cursor=next_cursor
         )
     except Exception as e:
         logger.error(f"Response building error for {address}: {str(e)}")
@@ -392,6 +555,13 @@ async def get_trades(
             "message": f"Failed to build response: {str(e)}"
         })
 
+    # The page expires when the wallet is next due for a refresh, not a full TTL after rendering
+    fresh_until = (now if should_refresh else last_fetched) + timedelta(minutes=CACHE_TTL_MINUTES)
+    page_ttl_seconds = math.ceil((fresh_until - datetime.now(timezone.utc)).total_seconds())
+    if page_ttl_seconds > 0:
+        await set_cached_response(response_key, response.model_dump_json(), page_ttl_seconds)
+    return response
+
 
 @router.delete("/trades/{address}")
 async def delete_trades_cache(
@@ -405,15 +575,25 @@ async def delete_trades_cache(
     logger.info(f"Deleting cache for {address}")
 
     try:
-        # Delete trades
+        # Delete tags of this wallet's trades, then the trades themselves
+        await db.execute(
+            delete(TradeTag).where(TradeTag.trade_tx_hash.in_(
+                select(Trade.tx_hash).where(Trade.wallet_address == address)
+            ))
+        )
         await db.execute(
             delete(Trade).where(Trade.wallet_address == address)
         )
-        # Delete cache metadata
+        # Delete cache metadata and precomputed analytics
         await db.execute(
             delete(CacheMetadata).where(CacheMetadata.wallet_address == address)
         )
+        await db.execute(
+            delete(WalletAnalytics).where(WalletAnalytics.wallet_address == address)
+        )
         await db.commit()
+        await invalidate_trades_responses(address)
+        evict_trades_cache(address)
 
         return {"status": "ok", "message": f"Deleted cache for {address}"}
     except Exception as e:
@@ -434,11 +614,15 @@ async def clear_all_data(
     logger.warning("Clearing ALL data from database")
 
     try:
-        # Delete all trades
+        # Delete all trades and their tags
+        await db.execute(delete(TradeTag))
         result_trades = await db.execute(delete(Trade))
-        # Delete all cache metadata
+        # Delete all cache metadata and precomputed analytics
         result_cache = await db.execute(delete(CacheMetadata))
+        await db.execute(delete(WalletAnalytics))
         await db.commit()
+        await invalidate_trades_responses()
+        evict_trades_cache()
 
         return {
             "status": "ok",
@@ -0,0 +1,97 @@
+import logging
+import time
+from redis import asyncio as aioredis
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Only created when REDIS_URL is configured; every helper is a no-op otherwise
+redis = aioredis.from_url(settings.redis_url) if settings.redis_url else None
+
+
+# /trades pages are keyed by a global and a per-wallet version token. Invalidating replaces the
+# token, so old pages are never read again and just expire; no keyspace SCAN is needed. The
+# tokens must outlive the pages, or a lapsed token would bring old pages back into use.
+TRADES_VERSION_TTL_SECONDS = 24 * 3600
+GLOBAL_TRADES_VERSION_KEY = "trades_version"
+
+
+def trades_version_key(address: str) -> str:
+    """Redis key for the version token of one wallet's /trades pages."""
+    return f"trades_version:{address}"
+
+
+async def trades_response_key(address: str, page: int, limit: int, after_ts, after_id) -> str:
+    """Redis key for one rendered /trades page of a wallet, under the current version tokens."""
+    versions = await get_cached_many([GLOBAL_TRADES_VERSION_KEY, trades_version_key(address)])
+    version = ".".join(v.decode() if v else "0" for v in versions)
+    return f"trades:{address}:{version}:{page}:{limit}:{after_ts.isoformat() if after_ts else ''}:{after_id or ''}"
+
+
+def market_info_key(token_id: str) -> str:
+    """Redis key for the Gamma market info of one outcome token."""
+    return f"mkt:{token_id}"
+
+
+async def get_cached_response(key: str) -> bytes | None:
+    """Serialized response stored under key, if any."""
+    if redis is None:
+        return None
+    try:
+        return await redis.get(key)
+    except Exception as e:
+        logger.warning(f"Redis GET failed for {key}: {e}")
+        return None
+
+
+async def set_cached_response(key: str, body: str | bytes, ttl_seconds: int) -> None:
+    """Store a serialized response under key for ttl_seconds."""
+    if redis is None:
+        return
+    try:
+        await redis.setex(key, ttl_seconds, body)
+    except Exception as e:
+        logger.warning(f"Redis SETEX failed for {key}: {e}")
+
+
+async def get_cached_many(keys: list[str]) -> list[bytes | None]:
+    """Values stored under keys in one MGET; None for each miss."""
+    if redis is None or not keys:
+        return [None] * len(keys)
+    try:
+        return await redis.mget(keys)
+    except Exception as e:
+        logger.warning(f"Redis MGET failed for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+
+
+async def set_cached_many(items: dict[str, tuple[bytes, int]]) -> None:
+    """Store each key's (value, ttl_seconds) in one pipeline."""
+    if redis is None or not items:
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key, (value, ttl_seconds) in items.items():
+                pipe.set(key, value, ex=ttl_seconds)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis pipeline SET failed for {len(items)} keys: {e}")
+
+
+async def invalidate_trades_responses(address: str | None = None) -> None:
+    """Retire cached /trades pages for one wallet, or for every wallet if address is None."""
+    if redis is None:
+        return
+    key = trades_version_key(address) if address else GLOBAL_TRADES_VERSION_KEY
+    try:
+        # A fresh token rather than INCR: a counter restarting after its key expired could reuse a live version
+        await redis.set(key, time.time_ns(), ex=TRADES_VERSION_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Redis invalidation failed for {key}: {e}")
+
+
+async def close_cache() -> None:
+    """Close the Redis connection pool; called on application shutdown."""
+    if redis is not None:
+        await redis.aclose()
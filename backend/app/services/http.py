@@ -0,0 +1,21 @@
+import httpx
+
+# One long-lived client for every outbound call (Gamma, Data API, subgraphs): connections,
+# TLS sessions and HTTP/2 streams are reused across requests instead of per call
+client = httpx.AsyncClient(
+    http2=True,
+    # Fail fast on unreachable hosts; slow paginated reads pass SLOW_TIMEOUT instead
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    # Accept-Encoding is left to httpx: gzip and deflate always, plus br when brotli is installed
+    headers={"User-Agent": "Harpoon/1.0"},
+    # Sized for concurrent refreshes; per-call semaphores only cap the request rate against Gamma
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30),
+)
+
+# For large paginated reads (Data API pages, subgraph queries)
+SLOW_TIMEOUT = httpx.Timeout(30.0, connect=3.0)
+
+
+async def close_client() -> None:
+    """Close the shared client; called on application shutdown."""
+    await client.aclose()
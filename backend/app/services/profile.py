@@ -1,9 +1,51 @@
+import orjson
 import re
-import httpx
+from async_lru import alru_cache
 from app.config import get_settings
+from app.services.http import client
+from app.utils.address import is_valid_address
 
 settings = get_settings()
 
+# Profiles and username lookups change rarely; cache them in-process
+PROFILE_CACHE_TTL_SECONDS = 300
+PROFILE_CACHE_MAXSIZE = 10_000
+
+# A username or URL maps to the same proxy wallet for its lifetime
+RESOLVE_CACHE_TTL_SECONDS = 3600
+
+POLYMARKET_PROFILE_PREFIX = "https://polymarket.com/@"
+
+# Profile input patterns, compiled once at import
+PROFILE_URL_ADDRESS_RE = re.compile(r"profile/(0x[a-fA-F0-9]{40})", re.IGNORECASE)
+PROFILE_URL_USERNAME_RE = re.compile(r"@([a-zA-Z0-9_-]+)")
+USERNAME_RE = re.compile(r"^[a-zA-Z0-9_-]+$")
+
+
+@alru_cache(maxsize=PROFILE_CACHE_MAXSIZE, ttl=PROFILE_CACHE_TTL_SECONDS)
+async def fetch_public_profile_cached(address: str) -> dict | None:
+    """Fetch a public profile; a missing profile is cached as None, errors raise."""
+    response = await client.get(
+        f"{settings.gamma_api_url}/public-profile",
+        params={"address": address.lower()}
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    # Build profile URL using name or pseudonym
+    username = data.get("name") or data.get("pseudonym")
+    profile_url = POLYMARKET_PROFILE_PREFIX + username if username else None
+
+    return {
+        "name": data.get("name"),
+        "pseudonym": data.get("pseudonym"),
+        "profile_image": data.get("profileImage"),
+        "bio": data.get("bio"),
+        "proxy_wallet": data.get("proxyWallet"),
+        "profile_url": profile_url,
+    }
+
 
 async def fetch_public_profile(address: str) -> dict | None:
     """
@@ -12,29 +54,10 @@ async def fetch_public_profile(address: str) -> dict | None:
     Returns dict with: name, pseudonym, profileImage, bio, proxyWallet, profileUrl
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.gamma_api_url}/public-profile",
-                params={"address": address.lower()},
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                # Build profile URL using name or pseudonym
-                username = data.get("name") or data.get("pseudonym")
-                profile_url = f"https://polymarket.com/@{username}" if username else None
-
-                return {
-                    "name": data.get("name"),
-                    "pseudonym": data.get("pseudonym"),
-                    "profile_image": data.get("profileImage"),
-                    "bio": data.get("bio"),
-                    "proxy_wallet": data.get("proxyWallet"),
-                    "profile_url": profile_url,
-                }
+        # Failures raise inside the cached call, so they are retried next time rather than cached
+        return await fetch_public_profile_cached(address)
     except Exception:
-        pass
-    return None
+        return None
 
 
 async def search_profile_by_username(username: str) -> str | None:
@@ -43,29 +66,26 @@ async def search_profile_by_username(username: str) -> str | None:
 
     Returns the proxy wallet address if found.
     """
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.gamma_api_url}/public-search",
-                params={
-                    "q": username,
-                    "search_profiles": "true",
-                    "limit_per_type": 1
-                },
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                profiles = data.get("profiles", [])
-                if profiles:
-                    wallet = profiles[0].get("proxyWallet")
-                    if wallet:
-                        return wallet.lower()
-    except Exception:
-        pass
+    response = await client.get(
+        f"{settings.gamma_api_url}/public-search",
+        params={
+            "q": username,
+            "search_profiles": "true",
+            "limit_per_type": 1
+        }
+    )
+    # Errors propagate so a failed search is not cached as "no such user"
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    profiles = data.get("profiles", [])
+    if profiles:
+        wallet = profiles[0].get("proxyWallet")
+        if wallet:
+            return wallet.lower()
     return None
 
 
+@alru_cache(maxsize=PROFILE_CACHE_MAXSIZE, ttl=RESOLVE_CACHE_TTL_SECONDS)
 async def resolve_profile_to_address(profile_input: str) -> str | None:
     """
     Resolve input to a wallet address.
@@ -74,37 +94,35 @@ async def resolve_profile_to_address(profile_input: str) -> str | None:
     - Wallet address (0x...)
     - Profile URL (https://polymarket.com/profile/0x... or https://polymarket.com/@username)
     - Username (e.g., "Svitovid")
+
+    Lookup failures raise rather than return None, so they are not cached.
     """
     profile_input = profile_input.strip()
 
-    # Already a valid address
-    if re.match(r"^0x[a-fA-F0-9]{40}$", profile_input):
-        return profile_input.lower()
+    # Already a valid address (the 0x prefix may be upper case); the common case, so no URL parsing
+    address = profile_input.lower()
+    if is_valid_address(address):
+        return address
 
     # Extract address or username from URL if present
     if "polymarket.com" in profile_input:
         # Look for address in URL: /profile/0x...
-        match = re.search(r"profile/(0x[a-fA-F0-9]{40})", profile_input, re.IGNORECASE)
+        match = PROFILE_URL_ADDRESS_RE.search(profile_input)
         if match:
             return match.group(1).lower()
 
         # Look for username in URL: /@username
-        match = re.search(r"@([a-zA-Z0-9_-]+)", profile_input)
+        match = PROFILE_URL_USERNAME_RE.search(profile_input)
         if match:
             username = match.group(1)
             # If it looks like an address, return it directly
-            if re.match(r"^0x[a-fA-F0-9]{40}$", username, re.IGNORECASE):
+            if is_valid_address(username.lower()):
                 return username.lower()
             # Otherwise search for the username
             return await search_profile_by_username(username)
 
-    # Check if the input itself looks like an address (case-insensitive)
-    if profile_input.lower().startswith("0x") and len(profile_input) == 42:
-        if re.match(r"^0x[a-fA-F0-9]{40}$", profile_input, re.IGNORECASE):
-            return profile_input.lower()
-
     # Try treating it as a username
-    if re.match(r"^[a-zA-Z0-9_-]+$", profile_input) and len(profile_input) >= 2:
+    if USERNAME_RE.match(profile_input) and len(profile_input) >= 2:
         return await search_profile_by_username(profile_input)
 
     return None
@@ -1,39 +1,121 @@
+import asyncio
 import httpx
 import logging
+import time
+import numpy as np
+import orjson
+from async_lru import alru_cache
+from cachetools import TLRUCache, TTLCache
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import attrgetter
 from app.config import get_settings
+from app.services.cache import market_info_key, get_cached_many, set_cached_many
+from app.services.http import client, SLOW_TIMEOUT
+from app.utils.batching import chunked
+from app.utils.workers import map_with_workers
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# IDs per Gamma /markets request, and how many of those requests run at once
+MARKET_BATCH_SIZE = 50
+MARKET_BATCH_CONCURRENCY = 3
+
+# Concurrent per-event Gamma tag lookups for CLOB markets
+GAMMA_WORKERS = 5
+
+# In-process cache of Gamma lookups (by token, condition and slug), shared by every request;
+# closed markets are settled, so they are kept much longer than live ones, unless their tag
+# lookup failed (tags None)
+GAMMA_CACHE_MAXSIZE = 50_000
+GAMMA_CACHE_TTL_SECONDS = 60
+CLOSED_GAMMA_CACHE_TTL_SECONDS = 3600
+
+# Distinct outcomes/clobTokenIds/outcomePrices strings whose parsed form is kept
+JSON_LIST_CACHE_MAXSIZE = 4096
+
+# Market info in Redis: open markets can still resolve; closed ones never change, but still
+# expire so the mkt:* keyspace does not grow without bound
+MARKET_INFO_CACHE_TTL_SECONDS = 24 * 3600
+CLOSED_MARKET_INFO_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+# Positions pages are retried on transient failures (transport errors, 429, 5xx) before giving up
+POSITIONS_RETRY_ATTEMPTS = 3
+POSITIONS_RETRY_MAX_WAIT_SECONDS = 4
+
+# Aware UTC epoch; adding timedeltas to it is far cheaper than datetime.fromtimestamp per row
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Subgraph page size; pages are walked with an id_gt cursor rather than skip
+SUBGRAPH_PAGE_SIZE = 100
+
+# Fetched trades stay fresh for TRADES_CACHE_TTL_SECONDS, then are served stale while refetching
+TRADES_CACHE_TTL_SECONDS = 60
+TRADES_CACHE_MAX_STALE_SECONDS = 300
+# The trades cache is bounded by the total number of records it holds, not by wallets
+TRADES_CACHE_MAX_RECORDS = 100_000
+trades_cache: TTLCache = TTLCache(
+    maxsize=TRADES_CACHE_MAX_RECORDS,
+    ttl=TRADES_CACHE_MAX_STALE_SECONDS,
+    getsizeof=lambda entry: len(entry[1]) + 1,
+)
+trades_fetches: dict[tuple[str, datetime | None], asyncio.Task] = {}
+
+gamma_cache: TLRUCache = TLRUCache(
+    maxsize=GAMMA_CACHE_MAXSIZE,
+    ttu=lambda key, info, now: now + (
+        CLOSED_GAMMA_CACHE_TTL_SECONDS if info.get("closed") and info.get("tags", ()) is not None
+        else GAMMA_CACHE_TTL_SECONDS
+    ),
+    timer=time.monotonic,
+)
+gamma_inflight: dict[str, asyncio.Future] = {}
+
+# Raw per-fill fields collected column-wise (structure of arrays) while paging the orderbook subgraph
+CLOB_FILL_COLUMNS = ("tx_hash", "timestamp", "maker_asset", "taker_asset", "user_is_maker", "maker_amount", "taker_amount")
+
+# Event tags are effectively static; many markets (and wallets) share an event
+EVENT_TAGS_CACHE_TTL_SECONDS = 3600
+EVENT_TAGS_CACHE_MAXSIZE = 10_000
+
+@dataclass(slots=True)
+class TradeRecord:
+    """One fetched trade, before it is stored; slots keep large histories compact."""
+    tx_hash: str
+    timestamp: datetime
+    side: str
+    amount: float
+    market_id: str | None = None
+    market_title: str | None = None
+    market_slug: str | None = None
+    outcome: str | None = None
+    price: float | None = None
+    token_id: str | None = None
+    block_number: int | None = None
+    tags: str | None = None
+    closed: bool = False
+    close_time: datetime | None = None
+    outcome_won: bool | None = None
+
+
 # Query for CLOB order fills (trades on the orderbook)
 ORDER_FILLS_QUERY = """
-query GetOrderFills($user: String!, $first: Int!, $skip: Int!) {
-  makerFills: orderFilledEvents(
-    where: { maker: $user }
-    orderBy: timestamp
-    orderDirection: desc
+query GetOrderFills($user: String!, $first: Int!, $since: BigInt!, $after_fills: String!) {
+  fills: orderFilledEvents(
+    where: {
+      or: [
+        { maker: $user, timestamp_gte: $since, id_gt: $after_fills }
+        { taker: $user, timestamp_gte: $since, id_gt: $after_fills }
+      ]
+    }
+    orderBy: id
+    orderDirection: asc
     first: $first
-    skip: $skip
-  ) {
-    id
-    timestamp
-    transactionHash
-    maker
-    taker
-    makerAssetId
-    takerAssetId
-    makerAmountFilled
-    takerAmountFilled
-  }
-  takerFills: orderFilledEvents(
-    where: { taker: $user }
-    orderBy: timestamp
-    orderDirection: desc
-    first: $first
-    skip: $skip
   ) {
     id
     timestamp
@@ -50,14 +132,17 @@ query GetOrderFills($user: String!, $first: Int!, $skip: Int!) {
 
 # Query for on-chain activity (splits = buy, merges = sell, redemptions = claim)
 ACTIVITY_QUERY = """
-query GetActivity($user: String!, $first: Int!, $skip: Int!) {
+query GetActivity(
+  $user: String!, $first: Int!, $since: BigInt!,
+  $after_splits: String!, $after_merges: String!, $after_redemptions: String!,
+  $include_splits: Boolean!, $include_merges: Boolean!, $include_redemptions: Boolean!
+) {
   splits(
-    where: { stakeholder: $user }
-    orderBy: timestamp
-    orderDirection: desc
+    where: { stakeholder: $user, timestamp_gte: $since, id_gt: $after_splits }
+    orderBy: id
+    orderDirection: asc
     first: $first
-    skip: $skip
-  ) {
+  ) @include(if: $include_splits) {
     id
     timestamp
     stakeholder
@@ -65,12 +150,11 @@ query GetActivity($user: String!, $first: Int!, $skip: Int!) {
     condition
   }
   merges(
-    where: { stakeholder: $user }
-    orderBy: timestamp
-    orderDirection: desc
+    where: { stakeholder: $user, timestamp_gte: $since, id_gt: $after_merges }
+    orderBy: id
+    orderDirection: asc
     first: $first
-    skip: $skip
-  ) {
+  ) @include(if: $include_merges) {
     id
     timestamp
     stakeholder
@@ -78,12 +162,11 @@ query GetActivity($user: String!, $first: Int!, $skip: Int!) {
     condition
   }
   redemptions(
-    where: { redeemer: $user }
-    orderBy: timestamp
-    orderDirection: desc
+    where: { redeemer: $user, timestamp_gte: $since, id_gt: $after_redemptions }
+    orderBy: id
+    orderDirection: asc
     first: $first
-    skip: $skip
-  ) {
+  ) @include(if: $include_redemptions) {
     id
     timestamp
     redeemer
@@ -93,158 +176,266 @@ query GetActivity($user: String!, $first: Int!, $skip: Int!) {
 }
 """
 
+# Send the queries without indentation and newlines; they go out with every page request
+ORDER_FILLS_QUERY = " ".join(ORDER_FILLS_QUERY.split())
+ACTIVITY_QUERY = " ".join(ACTIVITY_QUERY.split())
 
-async def fetch_event_tags(client: httpx.AsyncClient, event_id: str) -> list[str]:
-    """Fetch tags for an event."""
+
+@alru_cache(maxsize=EVENT_TAGS_CACHE_MAXSIZE, ttl=EVENT_TAGS_CACHE_TTL_SECONDS)
+async def fetch_event_tags_cached(client: httpx.AsyncClient, event_id: str) -> list[str]:
+    """Fetch tags for an event; concurrent and repeated lookups share one request."""
+    response = await client.get(
+        f"{settings.gamma_api_url}/events/{event_id}"
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    tags = data.get("tags", [])
+    return [tag.get("label") for tag in tags if tag.get("label")]
+
+
+async def fetch_event_tags(client: httpx.AsyncClient, event_id: str) -> list[str] | None:
+    """Fetch tags for an event; None if the lookup failed."""
     try:
-        response = await client.get(
-            f"{settings.gamma_api_url}/events/{event_id}",
-            timeout=10.0
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if isinstance(data, list):
-                data = data[0] if data else {}
-            tags = data.get("tags", [])
-            return [tag.get("label") for tag in tags if tag.get("label")]
+        # Failures raise inside the cached call, so they are retried next time rather than cached
+        return await fetch_event_tags_cached(client, event_id)
     except Exception:
-        pass
-    return []
+        return None
 
 
-async def fetch_single_market_by_token(client: httpx.AsyncClient, token_id: str) -> tuple[str, dict | None]:
-    """Fetch market info for a single token ID."""
-    import json
+@lru_cache(maxsize=JSON_LIST_CACHE_MAXSIZE)
+def parse_json_string_list(value: str) -> tuple:
+    """Parse one JSON-encoded list; immutable so cached results can be shared."""
+    return tuple(orjson.loads(value))
+
+
+def parse_json_list(value) -> tuple:
+    """Gamma encodes list fields such as outcomes and clobTokenIds as JSON strings."""
+    return parse_json_string_list(value) if isinstance(value, str) else tuple(value or ())
+
+
+def outcome_price_won(price) -> bool | None:
+    """Whether a resolved outcome price marks the winner; the plain "1"/"0" strings skip float parsing."""
+    if price == "1":
+        return True
+    if price == "0":
+        return False
     try:
-        response = await client.get(
-            f"{settings.gamma_api_url}/markets",
-            params={"clob_token_ids": token_id},
-            timeout=10.0
-        )
-        if response.status_code == 200:
-            markets = response.json()
-            if markets:
-                market = markets[0]
-                # Determine which outcome this token represents
-                # outcomes and clobTokenIds are JSON strings like '["Yes", "No"]'
-                outcome = None
-                outcome_won = None
-                try:
-                    outcomes_str = market.get("outcomes", "[]")
-                    token_ids_str = market.get("clobTokenIds", "[]")
-                    outcome_prices_str = market.get("outcomePrices", "[]")
-                    outcomes_list = json.loads(outcomes_str) if isinstance(outcomes_str, str) else outcomes_str
-                    token_ids_list = json.loads(token_ids_str) if isinstance(token_ids_str, str) else token_ids_str
-                    outcome_prices_list = json.loads(outcome_prices_str) if isinstance(outcome_prices_str, str) else outcome_prices_str
-
-                    # Find the index of our token_id and get corresponding outcome
-                    if token_id in token_ids_list:
-                        idx = token_ids_list.index(token_id)
-                        if idx < len(outcomes_list):
-                            outcome = outcomes_list[idx]
-                        # Check if this outcome won (price = "1" means it won)
-                        if idx < len(outcome_prices_list) and market.get("closed"):
-                            try:
-                                outcome_won = float(outcome_prices_list[idx]) == 1.0
-                            except (ValueError, TypeError):
-                                pass
-                except (json.JSONDecodeError, ValueError):
-                    pass
-
-                # Get event tags
-                tags = []
-                events = market.get("events", [])
-                if events:
-                    event_id = events[0].get("id")
-                    if event_id:
-                        tags = await fetch_event_tags(client, event_id)
-
-                # Parse close time if market is closed
-                close_time = None
-                if market.get("closed") and market.get("closedTime"):
-                    try:
-                        close_time = market.get("closedTime")
-                    except Exception:
-                        pass
-
-                return token_id, {
-                    "question": market.get("question"),
-                    "outcomes": market.get("outcomes"),
-                    "condition_id": market.get("conditionId"),
-                    "outcome": outcome,
-                    "tags": tags,
-                    "closed": market.get("closed", False),
-                    "close_time": close_time,
-                    "outcome_won": outcome_won
-                }
-    except Exception:
+        return float(price) == 1.0
+    except (ValueError, TypeError):
+        return None
+
+
+def build_token_market_info(market: dict, token_id: str, tags: list[str] | None) -> dict:
+    """Market info for one token, resolving which outcome it represents."""
+    closed = market.get("closed", False)
+    # Determine which outcome this token represents
+    # outcomes and clobTokenIds are JSON strings like '["Yes", "No"]'
+    outcome = None
+    outcome_won = None
+    try:
+        outcomes_list = parse_json_list(market.get("outcomes", "[]"))
+        token_ids_list = parse_json_list(market.get("clobTokenIds", "[]"))
+
+        # Find the index of our token_id and get corresponding outcome
+        if token_id in token_ids_list:
+            idx = token_ids_list.index(token_id)
+            if idx < len(outcomes_list):
+                outcome = outcomes_list[idx]
+            # Prices only decide a winner once the market is closed
+            if closed:
+                outcome_prices_list = parse_json_list(market.get("outcomePrices", "[]"))
+                if idx < len(outcome_prices_list):
+                    outcome_won = outcome_price_won(outcome_prices_list[idx])
+    except ValueError:
         pass
-    return token_id, None
+
+    return {
+        "question": market.get("question"),
+        "outcomes": market.get("outcomes"),
+        "condition_id": market.get("conditionId"),
+        "outcome": outcome,
+        "tags": tags,
+        "closed": closed,
+        "close_time": parse_close_time(market.get("closedTime")) if closed else None,
+        "outcome_won": outcome_won
+    }
 
 
-async def fetch_single_market_by_condition(client: httpx.AsyncClient, condition_id: str) -> tuple[str, dict | None]:
-    """Fetch market info for a single condition ID."""
+async def fetch_gamma_batch(client: httpx.AsyncClient, path: str, id_param: str, ids: list[str]) -> list[dict]:
+    """Fetch the Gamma rows (markets or events) matching a batch of IDs in one request."""
     try:
         response = await client.get(
-            f"{settings.gamma_api_url}/markets",
-            params={"condition_ids": condition_id},
-            timeout=10.0
+            f"{settings.gamma_api_url}/{path}",
+            params=[(id_param, i) for i in ids] + [("limit", len(ids))]
         )
         if response.status_code == 200:
-            markets = response.json()
-            if markets:
-                market = markets[0]
-                return condition_id, {
-                    "question": market.get("question"),
-                    "outcomes": market.get("outcomes")
-                }
-    except Exception:
-        pass
-    return condition_id, None
+            return orjson.loads(response.content) or []
+    except Exception as e:
+        logger.debug(f"Failed to fetch {path} by {id_param}: {e}")
+    return []
 
 
-async def fetch_market_info(client: httpx.AsyncClient, token_ids: list[str]) -> dict[str, dict]:
-    """Fetch market info from Gamma API by token IDs (one at a time, concurrently)."""
-    import asyncio
-    market_cache = {}
+async def fetch_gamma_batched(client: httpx.AsyncClient, path: str, id_param: str, ids: list[str]) -> list[dict]:
+    """Fetch Gamma rows for any number of IDs, MARKET_BATCH_SIZE per request."""
+    batches = await map_with_workers(
+        lambda batch: fetch_gamma_batch(client, path, id_param, batch),
+        list(chunked(ids, MARKET_BATCH_SIZE)),
+        MARKET_BATCH_CONCURRENCY,
+    )
+    return [row for batch in batches for row in batch]
 
-    # Limit concurrent requests
-    semaphore = asyncio.Semaphore(5)
 
-    async def fetch_with_semaphore(tid):
-        async with semaphore:
-            return await fetch_single_market_by_token(client, tid)
+async def cached_gamma_lookup(kind: str, ids: list[str], fetch) -> dict[str, dict]:
+    """Info for each ID from gamma_cache, calling fetch(missing_ids) -> {id: info} for the rest.
 
-    # Fetch all in parallel with rate limiting
-    results = await asyncio.gather(*[fetch_with_semaphore(tid) for tid in token_ids])
+    IDs another request is already fetching are awaited rather than fetched again.
+    """
+    found = {}
+    missing = []
+    waiting = {}
+    for i in dict.fromkeys(ids):
+        key = f"{kind}:{i}"
+        info = gamma_cache.get(key)
+        if info is not None:
+            found[i] = info
+        elif key in gamma_inflight:
+            waiting[i] = gamma_inflight[key]
+        else:
+            missing.append(i)
+
+    if missing:
+        loop = asyncio.get_running_loop()
+        futures = {i: loop.create_future() for i in missing}
+        for i, future in futures.items():
+            gamma_inflight[f"{kind}:{i}"] = future
+        try:
+            fetched = await fetch(missing)
+            for i, info in fetched.items():
+                gamma_cache[f"{kind}:{i}"] = info
+            found.update(fetched)
+        finally:
+            # Waiters get None for IDs Gamma did not return or when the fetch failed
+            for i, future in futures.items():
+                gamma_inflight.pop(f"{kind}:{i}", None)
+                if not future.done():
+                    future.set_result(found.get(i))
+
+    for i, future in waiting.items():
+        # Shielded so a cancelled waiter does not cancel the future other waiters share
+        info = await asyncio.shield(future)
+        if info is not None:
+            found[i] = info
+    return found
+
+
+def load_market_info(raw: bytes) -> dict:
+    """Market info as cached in Redis, with close_time turned back into a datetime."""
+    info = orjson.loads(raw)
+    info["close_time"] = parse_close_time(info.get("close_time"))
+    return info
 
-    for tid, info in results:
-        if info:
-            market_cache[tid] = info
 
-    return market_cache
+async def fetch_market_info(client: httpx.AsyncClient, token_ids: list[str]) -> dict[str, dict]:
+    """Fetch market info by token IDs, through the in-process cache."""
+    return await cached_gamma_lookup("tok", token_ids, lambda missing: fetch_market_info_shared(client, missing))
+
+
+async def fetch_market_info_shared(client: httpx.AsyncClient, token_ids: list[str]) -> dict[str, dict]:
+    """Fetch market info by token IDs, from Redis where cached and from Gamma in batches otherwise."""
+    cached = await get_cached_many([market_info_key(tid) for tid in token_ids])
+    market_info = {tid: load_market_info(raw) for tid, raw in zip(token_ids, cached) if raw is not None}
+    missing = [tid for tid in token_ids if tid not in market_info]
+    if not missing:
+        return market_info
+
+    fetched = await fetch_market_info_from_gamma(client, missing)
+    # Entries whose tag lookup failed (tags None) are not cached, so the next request retries it
+    await set_cached_many({
+        market_info_key(tid): (
+            orjson.dumps(info),
+            CLOSED_MARKET_INFO_CACHE_TTL_SECONDS if info["closed"] else MARKET_INFO_CACHE_TTL_SECONDS
+        )
+        for tid, info in fetched.items() if info["tags"] is not None
+    })
+    market_info.update(fetched)
+    return market_info
+
+
+async def fetch_market_info_from_gamma(client: httpx.AsyncClient, token_ids: list[str]) -> dict[str, dict]:
+    """Fetch market info from Gamma API by token IDs, in batches."""
+    markets_by_token = {}
+    wanted = set(token_ids)
+    for market in await fetch_gamma_batched(client, "markets", "clob_token_ids", token_ids):
+        try:
+            market_token_ids = parse_json_list(market.get("clobTokenIds", "[]"))
+        except ValueError:
+            continue
+        for tid in market_token_ids:
+            if tid in wanted:
+                markets_by_token[tid] = market
+
+    async def with_tags(item):
+        tid, market = item
+        # Get event tags
+        tags = []
+        events = market.get("events", [])
+        if events:
+            event_id = events[0].get("id")
+            if event_id:
+                tags = await fetch_event_tags(client, event_id)
+        return tid, build_token_market_info(market, tid, tags)
+
+    return dict(await map_with_workers(with_tags, list(markets_by_token.items()), GAMMA_WORKERS))
 
 
 async def fetch_market_info_by_condition(client: httpx.AsyncClient, condition_ids: list[str]) -> dict[str, dict]:
-    """Fetch market info from Gamma API by condition IDs (one at a time, concurrently)."""
-    import asyncio
-    market_cache = {}
-
-    # Limit concurrent requests
-    semaphore = asyncio.Semaphore(5)
+    """Fetch market info by condition IDs, through the in-process cache."""
+    return await cached_gamma_lookup(
+        "cond", condition_ids, lambda missing: fetch_market_info_by_condition_from_gamma(client, missing)
+    )
 
-    async def fetch_with_semaphore(cid):
-        async with semaphore:
-            return await fetch_single_market_by_condition(client, cid)
 
-    # Fetch all in parallel with rate limiting
-    results = await asyncio.gather(*[fetch_with_semaphore(cid) for cid in condition_ids])
+async def fetch_market_info_by_condition_from_gamma(client: httpx.AsyncClient, condition_ids: list[str]) -> dict[str, dict]:
+    """Fetch market info from Gamma API by condition IDs, in batches."""
+    market_cache = {}
+    wanted = set(condition_ids)
+    for market in await fetch_gamma_batched(client, "markets", "condition_ids", condition_ids):
+        cid = market.get("conditionId")
+        if cid in wanted:
+            market_cache[cid] = {
+                "question": market.get("question"),
+                "outcomes": market.get("outcomes"),
+                "closed": market.get("closed", False)
+            }
+    return market_cache
 
-    for cid, info in results:
-        if info:
-            market_cache[cid] = info
 
-    return market_cache
+def is_transient_http_error(exc: BaseException) -> bool:
+    """Connection-level failures, rate limiting and server errors are worth retrying."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+
+@retry(
+    retry=retry_if_exception(is_transient_http_error),
+    wait=wait_exponential(max=POSITIONS_RETRY_MAX_WAIT_SECONDS),
+    stop=stop_after_attempt(POSITIONS_RETRY_ATTEMPTS),
+    reraise=True,
+)
+async def fetch_positions_page(address: str, offset: int) -> list[dict]:
+    """One page of Data API positions; raises once retries are exhausted."""
+    response = await client.get(
+        "https://data-api.polymarket.com/positions",
+        params={"user": address, "limit": 100, "offset": offset},
+        timeout=SLOW_TIMEOUT
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 
 async def fetch_profit_from_positions(address: str) -> dict:
@@ -256,485 +447,569 @@ async def fetch_profit_from_positions(address: str) -> dict:
     result = {"realized_pnl": 0.0, "unrealized_pnl": 0.0, "total_pnl": 0.0}
     address = address.lower()
 
-    async with httpx.AsyncClient() as client:
-        offset = 0
-        while offset < 10000:
-            try:
-                response = await client.get(
-                    "https://data-api.polymarket.com/positions",
-                    params={"user": address, "limit": 100, "offset": offset},
-                    timeout=30.0
-                )
-
-                if response.status_code != 200:
-                    break
-
-                positions = response.json()
-                if not positions:
-                    break
-
-                for pos in positions:
-                    # realizedPnl includes P/L from partial closes
-                    result["realized_pnl"] += float(pos.get("realizedPnl") or 0)
-                    # cashPnl = currentValue - initialValue (unrealized)
-                    result["unrealized_pnl"] += float(pos.get("cashPnl") or 0)
+    offset = 0
+    while offset < 10000:
+        try:
+            positions = await fetch_positions_page(address, offset)
+            if not positions:
+                break
 
-                if len(positions) < 100:
-                    break
-                offset += 100
+            for pos in positions:
+                # realizedPnl includes P/L from partial closes
+                result["realized_pnl"] += float(pos.get("realizedPnl") or 0)
+                # cashPnl = currentValue - initialValue (unrealized)
+                result["unrealized_pnl"] += float(pos.get("cashPnl") or 0)
 
-            except Exception as e:
-                logger.error(f"Positions API error: {e}")
+            if len(positions) < 100:
                 break
+            offset += 100
+
+        except Exception as e:
+            logger.error(f"Positions API error: {e}")
+            break
 
     result["total_pnl"] = result["realized_pnl"] + result["unrealized_pnl"]
     logger.info(f"P/L for {address}: realized={result['realized_pnl']:.2f}, unrealized={result['unrealized_pnl']:.2f}")
     return result
 
 
-async def fetch_event_info_by_slug(client: httpx.AsyncClient, event_slug: str) -> dict:
-    """Fetch event info including tags from Gamma API."""
-    result = {"tags": []}
+async def fetch_event_info_by_slugs(client: httpx.AsyncClient, event_slugs: list[str]) -> dict[str, dict]:
+    """Fetch event info including tags, keyed by event slug, through the in-process cache."""
+    return await cached_gamma_lookup("evt", event_slugs, lambda missing: fetch_event_info_from_gamma(client, missing))
+
+
+async def fetch_event_info_from_gamma(client: httpx.AsyncClient, event_slugs: list[str]) -> dict[str, dict]:
+    """Fetch event info including tags from Gamma API, keyed by event slug."""
+    event_info = {}
+    for event in await fetch_gamma_batched(client, "events", "slug", event_slugs):
+        tags = event.get("tags") or []
+        event_info[event.get("slug")] = {
+            "tags": [tag.get("label") for tag in tags if tag.get("label")],
+            "closed": event.get("closed", False)
+        }
+    return event_info
+
+
+def market_resolution_info(market: dict) -> dict:
+    """Resolution status of a Gamma market: closed flag, close time and price per outcome."""
+    result = {
+        "closed": market.get("closed", False),
+        "close_time": parse_close_time(market.get("closedTime")),
+        "outcome_prices": {}
+    }
+    # Parse outcome prices to determine winner
     try:
-        response = await client.get(
-            f"{settings.gamma_api_url}/events/slug/{event_slug}",
-            timeout=10.0
-        )
-        if response.status_code == 200:
-            data = response.json()
-            tags = data.get("tags", [])
-            result["tags"] = [tag.get("label") for tag in tags if tag.get("label")]
-    except Exception:
+        outcomes = parse_json_list(market.get("outcomes", "[]"))
+        prices = parse_json_list(market.get("outcomePrices", "[]"))
+        for i, outcome in enumerate(outcomes):
+            if i < len(prices):
+                result["outcome_prices"][outcome] = float(prices[i])
+    except:
         pass
     return result
 
 
-async def fetch_market_info_by_slug(client: httpx.AsyncClient, market_slug: str) -> dict:
-    """Fetch market info including resolution status from Gamma API."""
-    result = {"closed": False, "close_time": None, "outcome_prices": {}}
+async def fetch_market_info_by_slugs(client: httpx.AsyncClient, market_slugs: list[str]) -> dict[str, dict]:
+    """Fetch market resolution info, keyed by market slug, through the in-process cache."""
+    return await cached_gamma_lookup("mkt", market_slugs, lambda missing: fetch_market_resolution_from_gamma(client, missing))
+
+
+async def fetch_market_resolution_from_gamma(client: httpx.AsyncClient, market_slugs: list[str]) -> dict[str, dict]:
+    """Fetch market info including resolution status from Gamma API, keyed by market slug."""
+    return {
+        market.get("slug"): market_resolution_info(market)
+        for market in await fetch_gamma_batched(client, "markets", "slug", market_slugs)
+    }
+
+
+def parse_close_time(value: str | None) -> datetime | None:
+    """Parse Gamma's closedTime (e.g. "2020-11-02 16:31:01+00"); None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        close_dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if close_dt.tzinfo is None:
+        close_dt = close_dt.replace(tzinfo=timezone.utc)
+    return close_dt
+
+
+def parse_data_api_timestamp(ts) -> datetime:
+    """Data API timestamps are unix epoch integers, occasionally ISO strings."""
+    if type(ts) is int:
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
+    return datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+
+
+def data_api_timestamp_seconds(ts) -> float:
+    """Unix seconds of a Data API timestamp; integers are used as is without building a datetime."""
+    if type(ts) is int:
+        return ts
+    return parse_data_api_timestamp(ts).timestamp()
+
+
+def parse_data_api_timestamps(values: list) -> list[datetime]:
+    """Parse a column of Data API timestamps, in one numpy pass when they are all integers."""
+    if all(type(value) is int for value in values):
+        return timestamps_to_datetimes(values)
+    return [parse_data_api_timestamp(value) for value in values]
+
+
+async def fetch_data_api_trades_page(address: str, offset: int) -> list[dict] | None:
+    """One page of raw Data API trades; None if the request failed."""
+    params = {"user": address, "limit": 100, "offset": offset}
     try:
         response = await client.get(
-            f"{settings.gamma_api_url}/markets",
-            params={"slug": market_slug},
-            timeout=10.0
+            "https://data-api.polymarket.com/trades",
+            params=params,
+            timeout=SLOW_TIMEOUT
         )
-        if response.status_code == 200:
-            markets = response.json()
-            if markets:
-                market = markets[0]
-                result["closed"] = market.get("closed", False)
-                result["close_time"] = market.get("closedTime")
-                # Parse outcome prices to determine winner
-                import json
-                outcomes_str = market.get("outcomes", "[]")
-                prices_str = market.get("outcomePrices", "[]")
-                try:
-                    outcomes = json.loads(outcomes_str) if isinstance(outcomes_str, str) else outcomes_str
-                    prices = json.loads(prices_str) if isinstance(prices_str, str) else prices_str
-                    for i, outcome in enumerate(outcomes):
-                        if i < len(prices):
-                            result["outcome_prices"][outcome] = float(prices[i])
-                except:
-                    pass
+        if response.status_code != 200:
+            logger.warning(f"Data API returned {response.status_code}")
+            return None
+        return orjson.loads(response.content)
     except Exception as e:
-        logger.debug(f"Failed to fetch market info for {market_slug}: {e}")
-    return result
+        logger.error(f"Data API error: {e}")
+        return None
 
 
-async def fetch_trades_from_data_api(address: str) -> list[dict]:
-    """Fetch trades from Polymarket Data API."""
-    all_trades = []
-    raw_trades = []
-    address = address.lower()
-    event_slugs = set()
-    market_slugs = set()
+async def iter_data_api_trade_pages(address: str, since: datetime | None = None):
+    """Yield pages of raw Data API trades for an address, newest first, stopping at `since`.
 
-    async with httpx.AsyncClient() as client:
-        offset = 0
-        max_trades = 5000  # Safety limit
-        while offset < max_trades:
-            params = {"user": address, "limit": 100, "offset": offset}
+    While one page is being filtered and consumed, the next one is already requested.
+    """
+    since_ts = since.timestamp() if since is not None else None
+    offset = 0
+    max_trades = 5000  # Safety limit
+    next_page = asyncio.create_task(fetch_data_api_trades_page(address, offset))
+    try:
+        while next_page is not None:
+            trades = await next_page
+            next_page = None
+            if not trades:
+                return
 
             try:
-                response = await client.get(
-                    "https://data-api.polymarket.com/trades",
-                    params=params,
-                    timeout=30.0
-                )
-
-                if response.status_code != 200:
-                    logger.warning(f"Data API returned {response.status_code}")
-                    break
-
-                trades = response.json()
-                if not trades:
-                    break
-
-                for trade in trades:
-                    raw_trades.append(trade)
-                    event_slug = trade.get("eventSlug")
-                    market_slug = trade.get("slug")
-                    if event_slug:
-                        event_slugs.add(event_slug)
-                    if market_slug:
-                        market_slugs.add(market_slug)
-
-                # Check for next page
-                if len(trades) < 100:
-                    break
-                offset += 100
-
+                # A full page that is still newer than `since` may have a successor; request it right away
+                if (
+                    len(trades) == 100
+                    and offset + 100 < max_trades
+                    and (since_ts is None or data_api_timestamp_seconds(trades[-1].get("timestamp")) >= since_ts)
+                ):
+                    offset += 100
+                    next_page = asyncio.create_task(fetch_data_api_trades_page(address, offset))
+
+                # Results are newest first: stop once we reach trades we already have
+                page = trades
+                if since_ts is not None:
+                    page = []
+                    for trade in trades:
+                        if data_api_timestamp_seconds(trade.get("timestamp")) < since_ts:
+                            break
+                        page.append(trade)
             except Exception as e:
                 logger.error(f"Data API error: {e}")
-                break
+                return
 
-        logger.info(f"Fetched {len(raw_trades)} raw trades for {address}")
-
-        # Fetch tags and market info concurrently
-        import asyncio
-        event_info_cache = {}
-        market_info_cache = {}
-        semaphore = asyncio.Semaphore(10)
-
-        async def fetch_event_with_semaphore(slug):
-            async with semaphore:
-                info = await fetch_event_info_by_slug(client, slug)
-                return slug, info
-
-        async def fetch_market_with_semaphore(slug):
-            async with semaphore:
-                info = await fetch_market_info_by_slug(client, slug)
-                return slug, info
-
-        # Fetch event info (for tags)
-        if event_slugs:
-            results = await asyncio.gather(*[fetch_event_with_semaphore(slug) for slug in list(event_slugs)[:50]])
-            for slug, info in results:
-                event_info_cache[slug] = info
-
-        # Fetch market info (for resolution status)
-        if market_slugs:
-            results = await asyncio.gather(*[fetch_market_with_semaphore(slug) for slug in list(market_slugs)[:50]])
-            for slug, info in results:
-                market_info_cache[slug] = info
-
-        # Process trades with tags and market resolution
-        for trade in raw_trades:
-            # timestamp is unix epoch integer
-            ts = trade.get("timestamp")
-            if isinstance(ts, int):
-                timestamp = datetime.fromtimestamp(ts, tz=timezone.utc)
-            else:
-                timestamp = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
-
-            # side is uppercase BUY/SELL
-            side = trade.get("side", "").lower()
-            if side not in ("buy", "sell"):
-                side = "buy"
-
-            # Get market info
-            outcome = trade.get("outcome", "")
-            title = trade.get("title") or trade.get("slug", "")
-            event_slug = trade.get("eventSlug")
-            market_slug = trade.get("slug")
-
-            # Get tags from event info
-            event_info = event_info_cache.get(event_slug, {})
-            tags = event_info.get("tags", [])
-
-            # Get market resolution status
-            market_info = market_info_cache.get(market_slug, {})
-            is_closed = market_info.get("closed", False)
-            close_time = market_info.get("close_time")
-            outcome_prices = market_info.get("outcome_prices", {})
-
-            # Determine if this outcome won (price > 0.99 means it won)
-            outcome_won = None
-            if is_closed and outcome and outcome in outcome_prices:
-                outcome_won = outcome_prices[outcome] > 0.99
-
-            # Calculate amount (size * price)
-            size = float(trade.get("size", 0))
-            price = float(trade.get("price", 0))
-            amount = size * price
-
-            all_trades.append({
-                "tx_hash": trade.get("transactionHash") or f"data-api-{trade.get('timestamp', '')}",
-                "timestamp": timestamp,
-                "market_id": trade.get("conditionId") or market_slug,
-                "market_title": title,
-                "market_slug": event_slug or market_slug,  # Use event slug for Polymarket URLs
-                "outcome": outcome,
-                "side": side,
-                "amount": round(amount, 2),
-                "price": round(price, 4) if price else None,
-                "token_id": trade.get("asset"),
-                "block_number": None,
-                "tags": ",".join(tags) if tags else None,
-                "closed": is_closed,
-                "close_time": close_time,
-                "outcome_won": outcome_won,
-            })
+            if page:
+                yield page
+    finally:
+        # The consumer stopped early or a page failed; drop the request in flight
+        if next_page is not None:
+            next_page.cancel()
 
-    logger.info(f"Fetched {len(all_trades)} trades from Data API for {address}")
-    return all_trades
 
+async def fetch_trades_from_data_api(address: str, since: datetime | None = None) -> list[TradeRecord]:
+    """Fetch trades from Polymarket Data API.
 
-async def fetch_trades_from_subgraph(address: str) -> list[dict]:
-    """Fetch all trades for an address from Data API and subgraphs."""
+    If `since` is given, only trades at or after it are returned.
+    """
     all_trades = []
+    raw_trades = []
     address = address.lower()
+    # Slugs already sent for lookup; lookups are batched, so every slug is looked up
+    event_slugs: set[str] = set()
+    market_slugs: set[str] = set()
+    lookups = []
+
+    async for page in iter_data_api_trade_pages(address, since):
+        raw_trades.extend(page)
+        # Slugs first seen on this page, de-duplicated in order of appearance
+        new_event_slugs = [
+            slug for slug in dict.fromkeys(trade.get("eventSlug") for trade in page)
+            if slug and slug not in event_slugs
+        ]
+        new_market_slugs = [
+            slug for slug in dict.fromkeys(trade.get("slug") for trade in page)
+            if slug and slug not in market_slugs
+        ]
+        event_slugs.update(new_event_slugs)
+        market_slugs.update(new_market_slugs)
+
+        # Look up this page's new slugs (tags per event, resolution per market) while the next page loads
+        if new_event_slugs or new_market_slugs:
+            lookups.append(asyncio.gather(
+                fetch_event_info_by_slugs(client, new_event_slugs),
+                fetch_market_info_by_slugs(client, new_market_slugs),
+            ))
+
+    logger.info(f"Fetched {len(raw_trades)} raw trades for {address}")
+
+    event_info_cache = {}
+    market_info_cache = {}
+    for event_info, market_info in await asyncio.gather(*lookups):
+        event_info_cache.update(event_info)
+        market_info_cache.update(market_info)
+
+    # Timestamps and amounts (size * price) are computed column-wise
+    timestamps = parse_data_api_timestamps([trade.get("timestamp") for trade in raw_trades])
+    prices = np.array([trade.get("price", 0) for trade in raw_trades], dtype=np.float64)
+    amounts = np.array([trade.get("size", 0) for trade in raw_trades], dtype=np.float64) * prices
+    # Tags are joined once per event rather than once per trade
+    event_tags = {slug: ",".join(info.get("tags", [])) or None for slug, info in event_info_cache.items()}
+
+    # Process trades with tags and market resolution
+    for trade, timestamp, price, amount in zip(raw_trades, timestamps, prices.tolist(), amounts.tolist()):
+
+        # side is uppercase BUY/SELL
+        side = trade.get("side", "").lower()
+        if side not in ("buy", "sell"):
+            side = "buy"
+
+        # Get market info
+        outcome = trade.get("outcome", "")
+        title = trade.get("title") or trade.get("slug", "")
+        event_slug = trade.get("eventSlug")
+        market_slug = trade.get("slug")
+
+        # Get market resolution status
+        market_info = market_info_cache.get(market_slug, {})
+        is_closed = market_info.get("closed", False)
+        close_time = market_info.get("close_time")
+        outcome_prices = market_info.get("outcome_prices", {})
+
+        # Determine if this outcome won (price > 0.99 means it won)
+        outcome_won = None
+        if is_closed and outcome and outcome in outcome_prices:
+            outcome_won = outcome_prices[outcome] > 0.99
+
+        all_trades.append(TradeRecord(
+            tx_hash=trade.get("transactionHash") or f"data-api-{trade.get('timestamp', '')}",
+            timestamp=timestamp,
+            market_id=trade.get("conditionId") or market_slug,
+            market_title=title,
+            market_slug=event_slug or market_slug,  # Use event slug for Polymarket URLs
+            outcome=outcome,
+            side=side,
+            amount=round(amount, 2),
+            price=round(price, 4) if price else None,
+            token_id=trade.get("asset"),
+            tags=event_tags.get(event_slug),
+            closed=is_closed,
+            close_time=close_time,
+            outcome_won=outcome_won,
+        ))
 
-    # First try the Data API (more complete data)
-    data_api_trades = await fetch_trades_from_data_api(address)
-    if data_api_trades:
-        return data_api_trades
-
-    # Fall back to subgraphs if Data API returns nothing
-    logger.info("Data API returned no trades, trying subgraphs...")
-
-    async with httpx.AsyncClient() as client:
-        # Fetch CLOB order fills
-        skip = 0
-        batch_size = 100
-        token_ids_to_lookup = set()
-
-        while True:
-            response = await client.post(
-                settings.orders_subgraph_url,
-                json={
-                    "query": ORDER_FILLS_QUERY,
-                    "variables": {
-                        "user": address,
-                        "first": batch_size,
-                        "skip": skip
-                    }
-                },
-                timeout=30.0
-            )
-
-            if response.status_code != 200:
-                break
+    logger.info(f"Fetched {len(all_trades)} trades from Data API for {address}")
+    return all_trades
 
-            data = response.json()
-            if "errors" in data:
-                break
 
-            maker_fills = data.get("data", {}).get("makerFills", [])
-            taker_fills = data.get("data", {}).get("takerFills", [])
+def timestamps_to_datetimes(timestamps: list[int]) -> list[datetime]:
+    """Convert Unix-second timestamps to aware UTC datetimes in one numpy pass."""
+    deltas = np.asarray(timestamps, dtype="timedelta64[s]").astype("timedelta64[us]").tolist()
+    return [UNIX_EPOCH + delta for delta in deltas]
 
-            if not maker_fills and not taker_fills:
-                break
 
-            # Log first fill to see structure
-            if maker_fills:
-                logger.info(f"Sample maker fill keys: {list(maker_fills[0].keys())}")
-            if taker_fills:
-                logger.info(f"Sample taker fill keys: {list(taker_fills[0].keys())}")
-
-            for fill in maker_fills + taker_fills:
-                timestamp = datetime.fromtimestamp(int(fill["timestamp"]), tz=timezone.utc)
-                tx_hash = fill.get("transactionHash") or fill.get("txHash") or fill.get("id", "").split("-")[0]
-
-                # Determine if this is a buy or sell based on asset IDs
-                # Asset ID 0 = USDC, non-zero = outcome token
-                maker_asset = fill.get("makerAssetId") or fill.get("makerAsset") or "0"
-                taker_asset = fill.get("takerAssetId") or fill.get("takerAsset") or "0"
-
-                # Check for maker/taker fields with different possible names
-                maker_addr = fill.get("maker") or fill.get("makerAddress") or ""
-                is_user_maker = maker_addr.lower() == address if maker_addr else (fill in maker_fills)
-
-                # Get amounts with fallbacks for different field names
-                maker_amount = int(fill.get("makerAmountFilled") or fill.get("makerAmount") or 0) / 1e6
-                taker_amount = int(fill.get("takerAmountFilled") or fill.get("takerAmount") or 0) / 1e6
-
-                if is_user_maker:
-                    if maker_asset == "0":
-                        # User is maker, giving USDC = buying outcome tokens
-                        side = "buy"
-                        token_id = taker_asset
-                        amount = maker_amount
-                        tokens = taker_amount
-                    else:
-                        # User is maker, giving tokens = selling
-                        side = "sell"
-                        token_id = maker_asset
-                        tokens = maker_amount
-                        amount = taker_amount
-                else:
-                    if taker_asset == "0":
-                        # User is taker, giving USDC = buying
-                        side = "buy"
-                        token_id = maker_asset
-                        amount = taker_amount
-                        tokens = maker_amount
-                    else:
-                        # User is taker, giving tokens = selling
-                        side = "sell"
-                        token_id = taker_asset
-                        tokens = taker_amount
-                        amount = maker_amount
-
-                price = amount / tokens if tokens > 0 else 0
-
-                if token_id != "0":
-                    token_ids_to_lookup.add(token_id)
-
-                all_trades.append({
-                    "tx_hash": tx_hash,
-                    "timestamp": timestamp,
-                    "market_id": None,
-                    "market_title": None,
-                    "outcome": None,
-                    "side": side,
-                    "amount": round(amount, 2),
-                    "price": round(price, 4) if price else None,
-                    "token_id": token_id if token_id != "0" else None,
-                    "block_number": None,
-                    "tags": None,
-                    "_source": "clob"
-                })
-
-            if len(maker_fills) < batch_size and len(taker_fills) < batch_size:
-                break
-            skip += batch_size
-
-        # Fetch market info for token IDs
-        if token_ids_to_lookup:
-            market_cache = await fetch_market_info(client, list(token_ids_to_lookup))
-            for trade in all_trades:
-                if trade.get("token_id") and trade["token_id"] in market_cache:
-                    info = market_cache[trade["token_id"]]
-                    trade["market_title"] = info.get("question")
-                    trade["market_id"] = info.get("condition_id")
-                    trade["outcome"] = info.get("outcome")
-                    trade["tags"] = ",".join(info.get("tags", [])) if info.get("tags") else None
-                    trade["closed"] = info.get("closed", False)
-                    trade["close_time"] = info.get("close_time")
-                    trade["outcome_won"] = info.get("outcome_won")
-
-        # Fetch activity (splits, merges, redemptions)
-        skip = 0
-        condition_ids_to_lookup = set()
-
-        while True:
-            response = await client.post(
-                settings.activity_subgraph_url,
-                json={
-                    "query": ACTIVITY_QUERY,
-                    "variables": {
-                        "user": address,
-                        "first": batch_size,
-                        "skip": skip
-                    }
-                },
-                timeout=30.0
+def parse_usdc_amounts(raw: list[str]) -> np.ndarray:
+    """Parse 6-decimal integer amount strings into floats, through int64 unless a value overflows it."""
+    try:
+        values = np.fromiter(map(int, raw), dtype=np.int64, count=len(raw))
+    except OverflowError:
+        # Only very large 18-decimal token amounts get here; Python ints convert to float without overflow
+        values = np.array([int(value) for value in raw], dtype=np.float64)
+    return values / 1e6
+
+
+def clob_fills_to_trades(columns: dict[str, list]) -> list[TradeRecord]:
+    """Turn columnar CLOB fills into trade records, deriving side, amounts and price with numpy."""
+    if not columns["tx_hash"]:
+        return []
+
+    maker_asset = np.array(columns["maker_asset"], dtype=object)
+    taker_asset = np.array(columns["taker_asset"], dtype=object)
+    user_is_maker = np.array(columns["user_is_maker"], dtype=bool)
+    maker_amount = parse_usdc_amounts(columns["maker_amount"])
+    taker_amount = parse_usdc_amounts(columns["taker_amount"])
+
+    # The user buys when the asset they give is USDC (asset ID 0). The USDC leg is the amount
+    # and the other leg the token count; which side of the fill holds USDC follows from that.
+    buy = np.where(user_is_maker, maker_asset, taker_asset) == "0"
+    usdc_from_maker = user_is_maker == buy
+    amount = np.where(usdc_from_maker, maker_amount, taker_amount)
+    tokens = np.where(usdc_from_maker, taker_amount, maker_amount)
+    token_id = np.where(usdc_from_maker, taker_asset, maker_asset)
+    price = np.divide(amount, tokens, out=np.zeros_like(amount), where=tokens > 0)
+
+    return [
+        TradeRecord(
+            tx_hash=tx_hash,
+            timestamp=ts,
+            side="buy" if is_buy else "sell",
+            amount=round(amt, 2),
+            price=round(p, 4) if p else None,
+            token_id=tid if tid != "0" else None,
+        )
+        for tx_hash, ts, is_buy, amt, p, tid in zip(
+            columns["tx_hash"], timestamps_to_datetimes(columns["timestamp"]), buy.tolist(),
+            amount.tolist(), price.tolist(), token_id.tolist()
+        )
+    ]
+
+
+async def fetch_subgraph_page(url: str, query: str, variables: dict) -> dict | None:
+    """POST one page of a subgraph query; None if the subgraph returned an error."""
+    response = await client.post(
+        url,
+        content=orjson.dumps({"query": query, "variables": variables}),
+        headers={"Content-Type": "application/json"},
+        timeout=SLOW_TIMEOUT
+    )
+    if response.status_code != 200:
+        return None
+    # Pages run to megabytes; decode them off the event loop
+    data = await asyncio.to_thread(orjson.loads, response.content)
+    if "errors" in data:
+        return None
+    return data.get("data", {})
+
+
+async def paginate_subgraph(url: str, query: str, address: str, since_ts: int, entities: tuple[str, ...]) -> list[dict]:
+    """Fetch every page of a subgraph query, advancing an id cursor per entity.
+
+    Each entity in the query takes an ``after_<entity>`` cursor and, when there is
+    more than one, an ``include_<entity>`` flag so exhausted entities drop out.
+    """
+    variables = {"user": address, "first": SUBGRAPH_PAGE_SIZE, "since": str(since_ts)}
+    variables.update({f"after_{entity}": "" for entity in entities})
+    remaining = list(entities)
+    pages = []
+    while remaining:
+        if len(entities) > 1:
+            variables.update({f"include_{entity}": entity in remaining for entity in entities})
+        page = await fetch_subgraph_page(url, query, variables)
+        if page is None:
+            break
+        pages.append(page)
+        for entity in tuple(remaining):
+            items = page.get(entity) or []
+            if items:
+                variables[f"after_{entity}"] = items[-1]["id"]
+            # A short page means this entity has nothing past the cursor
+            if len(items) < SUBGRAPH_PAGE_SIZE:
+                remaining.remove(entity)
+    return pages
+
+
+def parse_fill_pages(pages: list[dict], address: str) -> list[TradeRecord]:
+    """Turn pages of CLOB fills into trade records (without market info)."""
+    fill_columns = {column: [] for column in CLOB_FILL_COLUMNS}
+    # Thousands of fills share a few dozen asset IDs; keep one string object per distinct ID
+    asset_ids: dict[str, str] = {}
+
+    for page in pages:
+        fills = page.get("fills", [])
+
+        # Log first fill to see structure
+        if fills:
+            logger.info(f"Sample fill keys: {list(fills[0].keys())}")
+
+        for fill in fills:
+            # Only collect raw columns here; side/amount/price are derived in one vectorized pass below
+            fill_columns["tx_hash"].append(
+                fill.get("transactionHash") or fill.get("txHash") or fill.get("id", "").split("-")[0]
             )
-
-            if response.status_code != 200:
-                break
-
-            data = response.json()
-            if "errors" in data:
-                break
-
-            splits = data.get("data", {}).get("splits", [])
-            merges = data.get("data", {}).get("merges", [])
-            redemptions = data.get("data", {}).get("redemptions", [])
-
-            if not splits and not merges and not redemptions:
-                break
-
-            for split in splits:
-                timestamp = datetime.fromtimestamp(int(split["timestamp"]), tz=timezone.utc)
+            fill_columns["timestamp"].append(int(fill["timestamp"]))
+
+            # Asset ID 0 = USDC, non-zero = outcome token
+            maker_asset = fill.get("makerAssetId") or fill.get("makerAsset") or "0"
+            taker_asset = fill.get("takerAssetId") or fill.get("takerAsset") or "0"
+            fill_columns["maker_asset"].append(asset_ids.setdefault(maker_asset, maker_asset))
+            fill_columns["taker_asset"].append(asset_ids.setdefault(taker_asset, taker_asset))
+
+            # Check for maker/taker fields with different possible names
+            # The subgraph returns Bytes fields as lowercase hex, like the already lowercased address
+            maker_addr = fill.get("maker") or fill.get("makerAddress") or ""
+            fill_columns["user_is_maker"].append(maker_addr == address)
+
+            # Get amounts with fallbacks for different field names
+            fill_columns["maker_amount"].append(fill.get("makerAmountFilled") or fill.get("makerAmount") or "0")
+            fill_columns["taker_amount"].append(fill.get("takerAmountFilled") or fill.get("takerAmount") or "0")
+
+    return clob_fills_to_trades(fill_columns)
+
+
+async def fetch_clob_trades(address: str, since_ts: int) -> list[TradeRecord]:
+    """CLOB order fills for an address, enriched with Gamma market info."""
+    # One stream of fills where the user is maker or taker
+    pages = await paginate_subgraph(
+        settings.orders_subgraph_url, ORDER_FILLS_QUERY, address, since_ts, ("fills",)
+    )
+    # Parsing is CPU-bound; run it in a thread so the other pipeline's requests keep flowing
+    clob_trades = await asyncio.to_thread(parse_fill_pages, pages, address)
+    token_ids_to_lookup = {trade.token_id for trade in clob_trades if trade.token_id}
+
+    # Fetch market info for token IDs
+    if token_ids_to_lookup:
+        market_cache = await fetch_market_info(client, list(token_ids_to_lookup))
+        for trade in clob_trades:
+            info = market_cache.get(trade.token_id)
+            if info is None:
+                continue
+            trade.market_title = info.get("question")
+            trade.market_id = info.get("condition_id")
+            trade.outcome = info.get("outcome")
+            trade.tags = ",".join(info.get("tags", [])) if info.get("tags") else None
+            trade.closed = info.get("closed", False)
+            trade.close_time = info.get("close_time")
+            trade.outcome_won = info.get("outcome_won")
+
+    return clob_trades
+
+
+def parse_activity_pages(pages: list[dict]) -> tuple[list[TradeRecord], list[str]]:
+    """Turn pages of splits, merges and redemptions into trade records, plus their distinct condition IDs."""
+    # (timestamp, tx_hash, condition_id, side, amount) per row; timestamps are converted all at once below
+    rows = []
+    # Distinct condition IDs, also used to share one string object per ID across rows
+    condition_ids: dict[str, str] = {}
+
+    for page in pages:
+        # Splits are buys and merges sells of outcome tokens; redemptions pay out a resolved position
+        for entity, side, amount_field in (
+            ("splits", "buy", "amount"),
+            ("merges", "sell", "amount"),
+            ("redemptions", "redeem", "payout"),
+        ):
+            for event in page.get(entity, []):
                 # ID format: txhash_logindex
-                tx_hash = split["id"].split("_")[0]
-                condition_id = split.get("condition")
-                amount = int(split["amount"]) / 1e6
-
+                tx_hash = event["id"].split("_")[0]
+                condition_id = event.get("condition")
                 if condition_id:
-                    condition_ids_to_lookup.add(condition_id)
-
-                all_trades.append({
-                    "tx_hash": tx_hash,
-                    "timestamp": timestamp,
-                    "market_id": condition_id,
-                    "market_title": None,
-                    "outcome": None,
-                    "side": "buy",
-                    "amount": round(amount, 2),
-                    "price": None,
-                    "token_id": None,
-                    "block_number": None,
-                    "tags": None,
-                    "_source": "split"
-                })
-
-            for merge in merges:
-                timestamp = datetime.fromtimestamp(int(merge["timestamp"]), tz=timezone.utc)
-                tx_hash = merge["id"].split("_")[0]
-                condition_id = merge.get("condition")
-                amount = int(merge["amount"]) / 1e6
+                    condition_id = condition_ids.setdefault(condition_id, condition_id)
+                amount = int(event[amount_field]) / 1e6
+                rows.append((int(event["timestamp"]), tx_hash, condition_id, side, round(amount, 2)))
+
+    timestamps = timestamps_to_datetimes([row[0] for row in rows])
+    activity_trades = [
+        TradeRecord(tx_hash=tx_hash, timestamp=timestamp, market_id=condition_id, side=side, amount=amount)
+        for (_, tx_hash, condition_id, side, amount), timestamp in zip(rows, timestamps)
+    ]
+    return activity_trades, list(condition_ids)
+
+
+async def fetch_activity_trades(address: str, since_ts: int) -> list[TradeRecord]:
+    """Splits, merges and redemptions for an address, titled from Gamma by condition."""
+    pages = await paginate_subgraph(
+        settings.activity_subgraph_url, ACTIVITY_QUERY, address, since_ts, ("splits", "merges", "redemptions")
+    )
+    activity_trades, condition_ids = await asyncio.to_thread(parse_activity_pages, pages)
+
+    # Fetch market info for condition IDs
+    if condition_ids:
+        condition_cache = await fetch_market_info_by_condition(client, condition_ids)
+        for trade in activity_trades:
+            info = condition_cache.get(trade.market_id)
+            if info is not None:
+                trade.market_title = info.get("question")
+
+    return activity_trades
+
+
+async def fetch_trades_from_subgraph(address: str, since: datetime | None = None) -> list[TradeRecord]:
+    """Fetch trades for an address from Data API and subgraphs, cached per (address, since).
+
+    Results younger than TRADES_CACHE_TTL_SECONDS are returned as is. Older ones, up to
+    TRADES_CACHE_MAX_STALE_SECONDS, are returned immediately while a background task refetches
+    them (stale-while-revalidate). Concurrent misses share one fetch. Callers must treat the
+    returned list as read-only.
+    """
+    key = (address.lower(), since)
+    cached = trades_cache.get(key)
+    if cached is None:
+        # Shielded so a cancelled caller does not cancel the fetch other callers share
+        return await asyncio.shield(start_trades_fetch(key))
+
+    fetched_at, trades = cached
+    if time.monotonic() - fetched_at > TRADES_CACHE_TTL_SECONDS:
+        start_trades_fetch(key)
+    return trades
+
+
+def start_trades_fetch(key: tuple[str, datetime | None]) -> asyncio.Task:
+    """The in-flight fetch for key, starting one if none is running."""
+    task = trades_fetches.get(key)
+    if task is None:
+        task = asyncio.create_task(refetch_trades(key))
+        task.add_done_callback(log_trades_fetch_failure)
+        trades_fetches[key] = task
+    return task
+
+
+async def refetch_trades(key: tuple[str, datetime | None]) -> list[TradeRecord]:
+    """Fetch trades for key and store them in trades_cache."""
+    try:
+        trades = await fetch_all_trades(*key)
+    finally:
+        trades_fetches.pop(key, None)
+    # A single history larger than the whole cache is returned but not cached
+    if len(trades) < TRADES_CACHE_MAX_RECORDS:
+        trades_cache[key] = (time.monotonic(), trades)
+    return trades
+
+
+def log_trades_fetch_failure(task: asyncio.Task) -> None:
+    """Log a failed trades fetch, which may have been a background refetch nobody awaits."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Trade fetch failed: {task.exception()}")
+
+
+def evict_trades_cache(address: str | None = None) -> None:
+    """Drop cached trades for one address, or for every address when none is given."""
+    if address is None:
+        trades_cache.clear()
+        return
+    address = address.lower()
+    for key in [key for key in trades_cache if key[0] == address]:
+        trades_cache.pop(key, None)
 
-                if condition_id:
-                    condition_ids_to_lookup.add(condition_id)
-
-                all_trades.append({
-                    "tx_hash": tx_hash,
-                    "timestamp": timestamp,
-                    "market_id": condition_id,
-                    "market_title": None,
-                    "outcome": None,
-                    "side": "sell",
-                    "amount": round(amount, 2),
-                    "price": None,
-                    "token_id": None,
-                    "block_number": None,
-                    "tags": None,
-                    "_source": "merge"
-                })
-
-            for redemption in redemptions:
-                timestamp = datetime.fromtimestamp(int(redemption["timestamp"]), tz=timezone.utc)
-                tx_hash = redemption["id"].split("_")[0]
-                condition_id = redemption.get("condition")
-                payout = int(redemption["payout"]) / 1e6
 
-                if condition_id:
-                    condition_ids_to_lookup.add(condition_id)
-
-                all_trades.append({
-                    "tx_hash": tx_hash,
-                    "timestamp": timestamp,
-                    "market_id": condition_id,
-                    "market_title": None,
-                    "outcome": None,
-                    "side": "redeem",
-                    "amount": round(payout, 2),
-                    "price": None,
-                    "token_id": None,
-                    "block_number": None,
-                    "tags": None,
-                    "_source": "redemption"
-                })
-
-            if len(splits) < batch_size and len(merges) < batch_size and len(redemptions) < batch_size:
-                break
-            skip += batch_size
+async def fetch_all_trades(address: str, since: datetime | None = None) -> list[TradeRecord]:
+    """Fetch trades for an address from Data API and subgraphs.
+
+    With `since` (the newest trade already stored), only trades from that
+    point on are fetched, so refreshes are incremental. The subgraph fallback
+    only runs on a full fetch.
+    """
+    address = address.lower()
+    since_ts = int(since.timestamp()) if since else 0
 
-        # Fetch market info for condition IDs
-        if condition_ids_to_lookup:
-            condition_cache = await fetch_market_info_by_condition(client, list(condition_ids_to_lookup))
-            for trade in all_trades:
-                if trade.get("market_id") and trade["market_id"] in condition_cache and not trade.get("market_title"):
-                    info = condition_cache[trade["market_id"]]
-                    trade["market_title"] = info.get("question")
+    # First try the Data API (more complete data)
+    data_api_trades = await fetch_trades_from_data_api(address, since)
+    if data_api_trades or since is not None:
+        # An empty incremental result just means no new trades; the stored history came from
+        # the Data API, so the subgraphs would only repeat work or add rows it never stored
+        return data_api_trades
 
-    # Remove internal fields and sort by timestamp
-    for trade in all_trades:
-        trade.pop("_source", None)
+    # Fall back to subgraphs if the Data API has no history for the wallet at all
+    logger.info("Data API returned no trades, trying subgraphs...")
 
-    all_trades.sort(key=lambda x: x["timestamp"], reverse=True)
+    # The orderbook and activity subgraphs are independent; page through both at once
+    clob_trades, activity_trades = await asyncio.gather(
+        fetch_clob_trades(address, since_ts),
+        fetch_activity_trades(address, since_ts),
+    )
+    all_trades = clob_trades + activity_trades
+    all_trades.sort(key=attrgetter("timestamp"), reverse=True)
 
     return all_trades
@@ -1,8 +1,10 @@
-import re
+# Deletes every hex digit; an all-hex string translates to ""
+STRIP_HEX_DIGITS = str.maketrans("", "", "0123456789abcdefABCDEF")
 
 
 def is_valid_address(address: str) -> bool:
     """Check if a string is a valid Ethereum address."""
-    if not address:
+    # Length and prefix checks reject most non-addresses before the hex check runs
+    if not address or len(address) != 42 or not address.startswith("0x"):
         return False
-    return bool(re.match(r"^0x[a-fA-F0-9]{40}$", address))
+    return not address[2:].translate(STRIP_HEX_DIGITS)
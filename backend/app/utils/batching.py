@@ -0,0 +1,10 @@
+from collections.abc import Iterator, Sequence
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(seq: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """Yield consecutive slices of at most `size` items from a sequence."""
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
@@ -0,0 +1,28 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def map_with_workers(func: Callable[[T], Awaitable[R]], items: Sequence[T], workers: int) -> list[R]:
+    """Await func(item) for every item using a fixed pool of worker coroutines; results keep item order."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        queue.put_nowait((index, item))
+    results: list = [None] * len(items)
+
+    async def worker() -> None:
+        while not queue.empty():
+            index, item = queue.get_nowait()
+            results[index] = await func(item)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(min(workers, len(items)))]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # gather raises the first failure but leaves the other workers draining the queue
+        for task in tasks:
+            task.cancel()
+    return results
@@ -48,6 +48,11 @@ export interface InsiderMetrics {
   total_trades: number
 }
 
+export interface PageCursor {
+  after_ts: string
+  after_id: number
+}
+
 export interface TradesResponse {
   address: string
   profile: ProfileInfo | null
@@ -59,4 +64,5 @@ export interface TradesResponse {
   timezone_analysis: TimezoneAnalysis | null
   top_categories: CategoryStat[]
   insider_metrics: InsiderMetrics | null
+  next_cursor: PageCursor | null
 }